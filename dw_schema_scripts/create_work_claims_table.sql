@@ -0,0 +1,12 @@
+CREATE TABLE WorkClaims (
+    work_key NVARCHAR(450) PRIMARY KEY,
+    work_kind NVARCHAR(50),
+    owner NVARCHAR(200),
+    status NVARCHAR(20),
+    attempts INT,
+    detail NVARCHAR(MAX),
+    claimed_at DATETIME,
+    heartbeat_at DATETIME,
+    lease_expires_at DATETIME,
+    finished_at DATETIME
+);
@@ -0,0 +1,4 @@
+from .triggers.pipeline_cli_view import main
+
+if __name__ == "__main__":
+    main()
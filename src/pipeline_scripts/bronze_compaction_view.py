@@ -0,0 +1,362 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Directory holding the compacted Bronze files, one subdirectory per table
+COMPACTED_BRONZE_DIR = os.getenv('COMPACTED_BRONZE_DIR')
+
+# Parquet writer settings for compacted files
+COMPACTION_CODEC = os.getenv('COMPACTION_CODEC', 'zstd')
+COMPACTION_CODEC_LEVEL = int(os.getenv('COMPACTION_CODEC_LEVEL', '6'))
+COMPACTION_ROW_GROUP_SIZE = int(os.getenv('COMPACTION_ROW_GROUP_SIZE', '250000'))
+COMPACTION_USE_DICTIONARY = os.getenv('COMPACTION_USE_DICTIONARY', 'true').lower() == 'true'
+COMPACTION_TARGET_FILE_MB = int(os.getenv('COMPACTION_TARGET_FILE_MB', '128'))
+
+# Retention policy for compacted files; unset disables the corresponding rule
+BRONZE_RETENTION_DAYS = os.getenv('BRONZE_RETENTION_DAYS')
+BRONZE_RETENTION_MAX_GB = os.getenv('BRONZE_RETENTION_MAX_GB')
+
+# Lineage column and file metadata keys linking compacted rows to their source batch
+SOURCE_BATCH_COLUMN = "_source_batch"
+LINEAGE_METADATA_KEY = b"source_batches"
+BATCH_TIMESTAMP_FORMAT = '%Y%m%d_%H%M%S'
+
+# Subdirectory and file suffix of the invalid rows saved by the validation
+INVALIDS_DIR = "invalids"
+INVALIDS_SUFFIX = "_invalids"
+
+# Manifest in each batch directory listing the Bronze files loaded into the Silver layer
+LOADED_MANIFEST = "_loaded.jsonl"
+
+
+def _batch_time(batch_name):
+    return datetime.strptime(batch_name[:15], BATCH_TIMESTAMP_FORMAT)
+
+
+def _table_name(file_name):
+    return os.path.splitext(file_name)[0].replace(" ", "_").lower()
+
+
+def mark_bronze_file_loaded(file_path):
+    """
+    Record in its batch directory that a Bronze file was loaded into the Silver layer.
+
+    Only recorded files are compacted, so a file is never removed before it is loaded.
+    Workers loading files of the same batch append to the manifest concurrently.
+    """
+    entry = {"file": os.path.basename(file_path), "loaded": datetime.now().isoformat()}
+    with open(os.path.join(os.path.dirname(file_path), LOADED_MANIFEST), "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def read_loaded_bronze_files(batch_path):
+    """
+    Return the names of the Bronze files of a batch directory recorded as loaded.
+    """
+    manifest_path = os.path.join(batch_path, LOADED_MANIFEST)
+    if not os.path.exists(manifest_path):
+        return set()
+    with open(manifest_path) as f:
+        return {json.loads(line)["file"] for line in f if line.strip()}
+
+
+def read_source_batches(file_path):
+    """
+    Return the list of source batch directories a compacted file was built from.
+    """
+    metadata = pq.read_schema(file_path).metadata or {}
+    return json.loads(metadata.get(LINEAGE_METADATA_KEY, b"[]"))
+
+
+def _collect_bronze_files(bronze_dir, up_to_timestamp):
+    """
+    Group the loaded Parquet files of the Bronze batches by output stream: one stream per table
+    and one per table for the invalid rows saved by the validation.
+
+    A file is only collected once its batch manifest records it as loaded; the invalid rows of
+    a table are final once the table's file is loaded.
+
+    Returns:
+        dict: (table name, stream) -> list of (batch name, file path, size in bytes), oldest
+        batch first; stream is None for the table itself and INVALIDS_DIR for its invalid rows.
+    """
+    files_by_stream = {}
+    for batch_name in sorted(os.listdir(bronze_dir)):
+        batch_path = os.path.join(bronze_dir, batch_name)
+        if not os.path.isdir(batch_path):
+            continue
+        if up_to_timestamp and batch_name > up_to_timestamp:
+            continue
+        loaded = read_loaded_bronze_files(batch_path)
+        loaded_tables = {_table_name(file_name) for file_name in loaded}
+        for stream, stream_path in ((None, batch_path), (INVALIDS_DIR, os.path.join(batch_path, INVALIDS_DIR))):
+            if not os.path.isdir(stream_path):
+                continue
+            for file_name in sorted(os.listdir(stream_path)):
+                if not file_name.endswith('.parquet'):
+                    continue
+                table_name = _table_name(file_name)
+                if stream == INVALIDS_DIR and table_name.endswith(INVALIDS_SUFFIX):
+                    table_name = table_name[:-len(INVALIDS_SUFFIX)]
+                is_loaded = file_name in loaded if stream is None else table_name in loaded_tables
+                if not is_loaded:
+                    continue
+                file_path = os.path.join(stream_path, file_name)
+                files_by_stream.setdefault((table_name, stream), []).append(
+                    (batch_name, file_path, os.path.getsize(file_path))
+                )
+    return files_by_stream
+
+
+def _collect_small_compacted_files(table_dir, small_file_bytes):
+    """
+    Return previously compacted files of a table that are still below the target size.
+    """
+    if not os.path.isdir(table_dir):
+        return []
+    small_files = []
+    for file_name in sorted(os.listdir(table_dir)):
+        file_path = os.path.join(table_dir, file_name)
+        if file_name.endswith('.parquet') and os.path.getsize(file_path) < small_file_bytes:
+            small_files.append((None, file_path, os.path.getsize(file_path)))
+    return small_files
+
+
+def _read_with_lineage(batch_name, file_path):
+    table = pq.read_table(file_path)
+    if batch_name is None:
+        # Already compacted: the lineage column is present
+        return table, read_source_batches(file_path)
+    lineage = pa.array([batch_name] * table.num_rows, type=pa.string()).dictionary_encode()
+    table = table.replace_schema_metadata(None).append_column(SOURCE_BATCH_COLUMN, lineage)
+    return table, [batch_name]
+
+
+def _decode_dictionaries(table):
+    """
+    Cast dictionary-encoded columns to their value type so tables written before and after
+    type compaction can be concatenated.
+
+    Returns:
+        tuple: (decoded table, names of the columns that were dictionary-encoded)
+    """
+    encoded = set()
+    for index, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            encoded.add(field.name)
+            table = table.set_column(index, field.name, table.column(index).cast(field.type.value_type))
+    return table, encoded
+
+
+def _cast_conflicting_columns_to_string(tables):
+    types = {}
+    for table in tables:
+        for field in table.schema:
+            if not pa.types.is_null(field.type):
+                types.setdefault(field.name, set()).add(field.type)
+    conflicting = {name for name, field_types in types.items() if len(field_types) > 1}
+    cast_tables = []
+    for table in tables:
+        for index, field in enumerate(table.schema):
+            if field.name in conflicting:
+                table = table.set_column(index, field.name, table.column(index).cast(pa.string()))
+        cast_tables.append(table)
+    return cast_tables
+
+
+def _write_compacted_file(file_prefix, inputs, table_dir, codec, codec_level, row_group_size, use_dictionary):
+    """
+    Merge a group of input files into one compacted Parquet file.
+
+    Returns:
+        tuple: (output path, output size in bytes)
+    """
+    tables = []
+    source_batches = []
+    encoded = set()
+    for batch_name, file_path, _ in inputs:
+        table, batches = _read_with_lineage(batch_name, file_path)
+        table, table_encoded = _decode_dictionaries(table.replace_schema_metadata(None))
+        tables.append(table)
+        encoded |= table_encoded
+        source_batches.extend(batches)
+
+    try:
+        merged = pa.concat_tables(tables, promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # A column typed differently across batches (e.g. a CSV read back as strings) is kept as text
+        tables = _cast_conflicting_columns_to_string(tables)
+        merged = pa.concat_tables(tables, promote_options="permissive")
+    merged = merged.combine_chunks()
+    # Keep the compacted columns (and the lineage column) dictionary-encoded
+    for index, name in enumerate(merged.column_names):
+        if name in encoded:
+            merged = merged.set_column(index, name, merged.column(index).dictionary_encode())
+    source_batches = sorted(set(source_batches))
+    merged = merged.replace_schema_metadata({
+        LINEAGE_METADATA_KEY: json.dumps(source_batches).encode(),
+    })
+
+    os.makedirs(table_dir, exist_ok=True)
+    output_path = os.path.join(table_dir, f"{file_prefix}-{source_batches[0]}-{source_batches[-1]}.parquet")
+    tmp_path = f"{output_path}.tmp"
+    pq.write_table(
+        merged,
+        tmp_path,
+        row_group_size=row_group_size,
+        compression=codec,
+        compression_level=codec_level,
+        use_dictionary=use_dictionary,
+    )
+    os.replace(tmp_path, output_path)
+    return output_path, os.path.getsize(output_path)
+
+
+def compact_bronze(bronze_dir, compacted_dir=COMPACTED_BRONZE_DIR, up_to_timestamp=None,
+                   codec=COMPACTION_CODEC, codec_level=COMPACTION_CODEC_LEVEL,
+                   row_group_size=COMPACTION_ROW_GROUP_SIZE, use_dictionary=COMPACTION_USE_DICTIONARY,
+                   target_file_mb=COMPACTION_TARGET_FILE_MB):
+    """
+    Merge the small per-batch Bronze Parquet files of each table into right-sized compacted files.
+
+    Only the files each batch's manifest records as loaded into the Silver layer are compacted,
+    so files still pending (e.g. mid-batch or failed and awaiting a retry) stay in place. Every
+    compacted row keeps its source batch in the `_source_batch` column and each file lists its
+    batches in its metadata. The invalid rows saved under each batch's `invalids` directory are
+    compacted the same way into `<table>/invalids`. Source files are removed once merged, and a
+    batch directory is deleted once all its files were loaded and compacted.
+
+    Args:
+        bronze_dir (str): Path to the Bronze directory containing timestamped batches.
+        compacted_dir (str): Directory for the compacted files.
+        up_to_timestamp (str): Last batch (`YYYYMMDD_HHMMSS`) to compact; no limit if None.
+        codec (str): Parquet compression codec.
+        codec_level (int): Compression level of the codec.
+        row_group_size (int): Maximum number of rows per row group.
+        use_dictionary (bool): Whether to dictionary-encode columns.
+        target_file_mb (int): Approximate size of each compacted file on disk.
+
+    Returns:
+        dict: Report with files merged, files written, bytes before/after and bytes saved.
+    """
+    try:
+        report = {"tables": 0, "files_merged": 0, "files_written": 0, "bytes_before": 0, "bytes_after": 0}
+        target_bytes = target_file_mb * 1024 * 1024
+
+        for (table_name, stream), bronze_files in _collect_bronze_files(bronze_dir, up_to_timestamp).items():
+            # Invalid rows are compacted into their own files under the table's directory
+            table_dir = os.path.join(compacted_dir, table_name, *([stream] if stream else []))
+            file_prefix = f"{table_name}{INVALIDS_SUFFIX}" if stream else table_name
+            inputs = _collect_small_compacted_files(table_dir, target_bytes // 2) + bronze_files
+
+            # Group consecutive inputs until the group reaches the target size
+            groups, current, current_bytes = [], [], 0
+            for entry in inputs:
+                current.append(entry)
+                current_bytes += entry[2]
+                if current_bytes >= target_bytes:
+                    groups.append(current)
+                    current, current_bytes = [], 0
+            if current:
+                groups.append(current)
+
+            for group in groups:
+                output_path, output_bytes = _write_compacted_file(
+                    file_prefix, group, table_dir, codec, codec_level, row_group_size, use_dictionary
+                )
+                for _, file_path, _ in group:
+                    if file_path != output_path:
+                        os.remove(file_path)
+                report["files_merged"] += len(group)
+                report["files_written"] += 1
+                report["bytes_before"] += sum(entry[2] for entry in group)
+                report["bytes_after"] += output_bytes
+
+            report["tables"] += 0 if stream else 1
+            print(f"[ {datetime.now()} ]-------- Compacted {len(inputs)} file(s) of '{file_prefix}' "
+                  f"into {len(groups)} file(s).")
+
+        # Remove the batch directories whose loaded files were all compacted; a directory without
+        # a manifest may still be being extracted
+        for batch_name in os.listdir(bronze_dir):
+            batch_path = os.path.join(bronze_dir, batch_name)
+            if not os.path.isdir(batch_path) or not os.path.exists(os.path.join(batch_path, LOADED_MANIFEST)):
+                continue
+            invalids_path = os.path.join(batch_path, INVALIDS_DIR)
+            if os.path.isdir(invalids_path) and not os.listdir(invalids_path):
+                os.rmdir(invalids_path)
+            if os.listdir(batch_path) == [LOADED_MANIFEST]:
+                os.remove(os.path.join(batch_path, LOADED_MANIFEST))
+                os.rmdir(batch_path)
+
+        report["bytes_saved"] = report["bytes_before"] - report["bytes_after"]
+        print(f"[ {datetime.now()} ]-------- Bronze compaction report: {report}")
+        return report
+    except Exception as e:
+        print(f"[ {datetime.now()} ]-------- Error during Bronze compaction: {e}")
+        raise
+
+
+def apply_retention(compacted_dir=COMPACTED_BRONZE_DIR, max_age_days=BRONZE_RETENTION_DAYS,
+                    max_total_gb=BRONZE_RETENTION_MAX_GB):
+    """
+    Delete compacted Bronze files older than the retention age or beyond the size budget.
+
+    The age of a file is the age of the newest batch it contains. When the size budget is
+    exceeded, the oldest files are deleted first.
+
+    Args:
+        compacted_dir (str): Directory holding the compacted files.
+        max_age_days (int): Maximum age in days; no age limit if None.
+        max_total_gb (float): Maximum total size in GB; no size limit if None.
+
+    Returns:
+        dict: Report with the number of files deleted and bytes freed.
+    """
+    try:
+        report = {"files_deleted": 0, "bytes_freed": 0}
+        if not compacted_dir or not os.path.isdir(compacted_dir):
+            return report
+
+        files = []
+        for table_name in os.listdir(compacted_dir):
+            table_dir = os.path.join(compacted_dir, table_name)
+            if not os.path.isdir(table_dir):
+                continue
+            for stream_dir in (table_dir, os.path.join(table_dir, INVALIDS_DIR)):
+                if not os.path.isdir(stream_dir):
+                    continue
+                for file_name in os.listdir(stream_dir):
+                    if file_name.endswith('.parquet'):
+                        file_path = os.path.join(stream_dir, file_name)
+                        newest_batch = read_source_batches(file_path)[-1]
+                        files.append((_batch_time(newest_batch), file_path, os.path.getsize(file_path)))
+        files.sort()
+
+        expired = []
+        if max_age_days is not None:
+            cutoff = datetime.now() - timedelta(days=float(max_age_days))
+            expired = [entry for entry in files if entry[0] < cutoff]
+            files = [entry for entry in files if entry[0] >= cutoff]
+
+        if max_total_gb is not None:
+            budget = float(max_total_gb) * 1024 ** 3
+            total = sum(entry[2] for entry in files)
+            while files and total > budget:
+                entry = files.pop(0)
+                expired.append(entry)
+                total -= entry[2]
+
+        for _, file_path, size in expired:
+            os.remove(file_path)
+            report["files_deleted"] += 1
+            report["bytes_freed"] += size
+
+        print(f"[ {datetime.now()} ]-------- Bronze retention report: {report}")
+        return report
+    except Exception as e:
+        print(f"[ {datetime.now()} ]-------- Error applying Bronze retention: {e}")
+        raise
@@ -1,52 +1,325 @@
+import csv
+import io
+import json
 import os
+import shutil
+import typing
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.json as pa_json
+import pyarrow.parquet as pq
 from datetime import datetime
+from ..utils.type_compaction_view import compact_arrow_table, compact_frame_types
+from ..utils.validation_models import get_pydantic_model_for_table
 
 # Directory to store Parquet files for the Bronze layer
 BRONZE_DIR = os.getenv('BRONZE_DIR')
 
-def save_to_parquet(sheet_name: str, dataframe: pd.DataFrame, bronze_dir: str = BRONZE_DIR):
+# Block size of the multithreaded CSV/JSON Lines parsers; each block is parsed on its own thread
+READER_BLOCK_SIZE = int(os.getenv('READER_BLOCK_SIZE', str(4 * 1024 * 1024)))
+
+# Readers by format name and the file extensions dispatched to them
+READERS = {}
+EXTENSION_FORMATS = {}
+
+# Arrow types of the Pydantic field annotations
+ARROW_TYPES = {
+    int: pa.int64(),
+    float: pa.float64(),
+    str: pa.string(),
+    datetime: pa.timestamp('ns'),
+}
+
+def create_batch_dir(bronze_dir: str = BRONZE_DIR) -> str:
+    """
+    Create a new timestamped batch directory in the Bronze directory.
+
+    A numeric suffix is added when another process created a batch in the same second.
+
+    Args:
+        bronze_dir (str): Directory to create the batch directory in.
+
+    Returns:
+        str: Path of the created batch directory.
+    """
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    batch_dir = os.path.join(bronze_dir, timestamp)
+    suffix = 0
+    while True:
+        try:
+            os.makedirs(batch_dir)
+            return batch_dir
+        except FileExistsError:
+            suffix += 1
+            batch_dir = os.path.join(bronze_dir, f"{timestamp}_{suffix:02d}")
+
+def register_reader(format_name: str, *extensions: str):
+    """
+    Register a reader function for a file format and the extensions that map to it.
+
+    A reader takes a file path and a compression name (or None) and returns a dictionary
+    of table name to `pd.DataFrame` or `pyarrow.Table`.
+    """
+    def decorator(reader):
+        READERS[format_name] = reader
+        for extension in extensions:
+            EXTENSION_FORMATS[extension] = format_name
+        return reader
+    return decorator
+
+
+def _strip_compression(file_name: str):
+    if file_name.lower().endswith('.gz'):
+        return file_name[:-3], 'gzip'
+    return file_name, None
+
+
+def _table_name_from_file(file_path: str) -> str:
+    file_name, _ = _strip_compression(os.path.basename(file_path))
+    return os.path.splitext(file_name)[0].replace(" ", "_").lower()
+
+
+def sniff_format(file_path: str):
     """
-    Save a DataFrame as a Parquet file in the Bronze directory.
+    Detect the format of a file from its extension, or from its first bytes if the extension is unknown.
+
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        tuple: (format name, compression name or None)
+    """
+    file_name, compression = _strip_compression(os.path.basename(file_path))
+    extension = os.path.splitext(file_name)[1].lower()
+
+    with open(file_path, 'rb') as f:
+        head = f.read(2)
+    if head == b'\x1f\x8b':
+        compression = 'gzip'
+
+    if extension in EXTENSION_FORMATS:
+        return EXTENSION_FORMATS[extension], compression
+
+    with pa.input_stream(file_path, compression=compression) as stream:
+        head = stream.read(4096)
+    if head.startswith(b'PK') or head.startswith(b'\xd0\xcf\x11\xe0'):
+        return 'excel', compression
+    if head.lstrip().startswith((b'{', b'[')):
+        return 'json', compression
+    return 'csv', compression
+
+
+def arrow_type_for_field(annotation):
+    """
+    Map a Pydantic field annotation (including Optional[...]) to an Arrow type.
+    """
+    if typing.get_origin(annotation) is typing.Union:
+        annotation = next(arg for arg in typing.get_args(annotation) if arg is not type(None))
+    return ARROW_TYPES.get(annotation, pa.string())
+
+
+def arrow_types_for_columns(table_name: str, column_names):
+    """
+    Return the Arrow types of the columns matching the fields of the table's Pydantic model.
+
+    Args:
+        table_name (str): Name of the table.
+        column_names (list): Column names as they appear in the file.
+
+    Returns:
+        dict: Column name to Arrow type; empty if the table has no model.
+    """
+    try:
+        model = get_pydantic_model_for_table(table_name)
+    except ValueError:
+        return {}
+
+    column_types = {}
+    for column in column_names:
+        sanitized = (column.replace(" ", "_")
+                           .replace("(", "")
+                           .replace(")", "")
+                           .replace("%", "percent").lower())
+        if sanitized in model.model_fields:
+            column_types[column] = arrow_type_for_field(model.model_fields[sanitized].annotation)
+    return column_types
+
+
+def _read_first_line(file_path: str, compression):
+    # Read up to the first line break so a multibyte character is never cut in two
+    head = b''
+    with pa.input_stream(file_path, compression=compression) as stream:
+        while b'\n' not in head:
+            chunk = stream.read(64 * 1024)
+            if not chunk:
+                break
+            head += chunk
+    return head.split(b'\n', 1)[0].decode('utf-8-sig').rstrip('\r')
+
+
+@register_reader('excel', '.xlsx', '.xlsm', '.xls')
+def read_excel_file(file_path: str, compression=None):
+    """
+    Read all sheets of an Excel file into a dictionary of DataFrames.
+    """
+    if compression:
+        with pa.input_stream(file_path, compression=compression) as stream:
+            return pd.read_excel(io.BytesIO(stream.read()), sheet_name=None)
+    return pd.read_excel(file_path, sheet_name=None)
+
+
+@register_reader('csv', '.csv', '.txt')
+def read_csv_file(file_path: str, compression=None):
+    """
+    Read a CSV file with the multithreaded Arrow parser, typed after the table's model.
+
+    Columns matching the model are parsed with its types. If a value does not parse,
+    those columns are read as strings and left to the row validation.
+    """
+    table_name = _table_name_from_file(file_path)
+    header = next(csv.reader([_read_first_line(file_path, compression)]), [])
+    column_types = arrow_types_for_columns(table_name, header)
+    read_options = pa_csv.ReadOptions(use_threads=True, block_size=READER_BLOCK_SIZE)
+
+    try:
+        with pa.input_stream(file_path, compression=compression) as stream:
+            table = pa_csv.read_csv(stream, read_options=read_options,
+                                    convert_options=pa_csv.ConvertOptions(column_types=column_types))
+    except pa.ArrowInvalid:
+        string_types = {column: pa.string() for column in column_types}
+        with pa.input_stream(file_path, compression=compression) as stream:
+            table = pa_csv.read_csv(stream, read_options=read_options,
+                                    convert_options=pa_csv.ConvertOptions(column_types=string_types))
+    return {table_name: table}
+
+
+@register_reader('jsonl', '.jsonl', '.ndjson')
+def read_jsonl_file(file_path: str, compression=None):
+    """
+    Read a JSON Lines file with the multithreaded Arrow parser, typed after the table's model.
+
+    If a value does not match the model's type, the schema is inferred instead and
+    the values are left to the row validation.
+    """
+    table_name = _table_name_from_file(file_path)
+    first_line = _read_first_line(file_path, compression)
+    column_types = arrow_types_for_columns(table_name, list(json.loads(first_line)) if first_line else [])
+    read_options = pa_json.ReadOptions(use_threads=True, block_size=READER_BLOCK_SIZE)
+    parse_options = pa_json.ParseOptions(
+        explicit_schema=pa.schema(list(column_types.items())) if column_types else None,
+        unexpected_field_behavior='infer',
+    )
+
+    try:
+        with pa.input_stream(file_path, compression=compression) as stream:
+            table = pa_json.read_json(stream, read_options=read_options, parse_options=parse_options)
+    except pa.ArrowInvalid:
+        with pa.input_stream(file_path, compression=compression) as stream:
+            table = pa_json.read_json(stream, read_options=read_options)
+    return {table_name: table}
+
+
+def _is_json_lines(first_line: str) -> bool:
+    """
+    Whether a first line is a complete JSON record, as opposed to the start of a JSON document.
+    """
+    try:
+        record = json.loads(first_line)
+    except ValueError:
+        return False
+    # A one-line object of record arrays is a document of tables, not a record
+    return isinstance(record, dict) and not (record and all(isinstance(value, list) for value in record.values()))
+
+
+@register_reader('json', '.json')
+def read_json_file(file_path: str, compression=None):
+    """
+    Read a JSON document into a dictionary of DataFrames.
+
+    An array of records is read as one table and an object of record arrays as one table
+    per key, like the sheets of a workbook. A `.json` file holding JSON Lines is passed
+    to the JSON Lines reader.
+    """
+    if _is_json_lines(_read_first_line(file_path, compression)):
+        return read_jsonl_file(file_path, compression)
+
+    with pa.input_stream(file_path, compression=compression) as stream:
+        document = json.loads(stream.read())
+    if isinstance(document, dict) and document and all(isinstance(value, list) for value in document.values()):
+        return {name: pd.DataFrame(records) for name, records in document.items()}
+    if isinstance(document, dict):
+        document = [document]
+    return {_table_name_from_file(file_path): pd.DataFrame(document)}
+
+
+def save_to_parquet(sheet_name: str, dataframe, bronze_dir: str = BRONZE_DIR, batch_dir: str = None):
+    """
+    Save a DataFrame or Arrow table as a Parquet file in the Bronze directory.
 
     Args:
         sheet_name (str): Name of the sheet to save.
-        dataframe (pd.DataFrame): DataFrame to save as a Parquet file.
+        dataframe (pd.DataFrame | pa.Table): DataFrame or Arrow table to save as a Parquet file.
         bronze_dir (str): Directory to save the Parquet files.
+        batch_dir (str): Batch directory to save into; a new timestamped one is created if None.
     """
     try:
         # Create a timestamped subdirectory
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        timestamped_dir = os.path.join(bronze_dir, timestamp)
-        os.makedirs(timestamped_dir, exist_ok=True)
+        timestamped_dir = batch_dir or create_batch_dir(bronze_dir)
 
         # Define the file path
         file_path = os.path.join(timestamped_dir, f"{sheet_name.lower()}.parquet")
 
-        # Save the DataFrame to a Parquet file
-        dataframe.to_parquet(file_path, index=False)
+        # Save the DataFrame to a Parquet file; Arrow tables are written as-is.
+        # Write through a temporary name so workers sharing the Bronze directory never read a partial file
+        tmp_path = f"{file_path}.tmp"
+        if isinstance(dataframe, pa.Table):
+            pq.write_table(dataframe, tmp_path)
+        else:
+            dataframe.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, file_path)
         print(f"[ {datetime.now()} ]-------- Saved sheet '{sheet_name}' as Parquet file: {file_path}")
     except Exception as e:
         print(f"[ {datetime.now()} ]-------- Error saving sheet '{sheet_name}' to Parquet: {e}")
+        raise
 
 def extract_and_store_bronze(file_path: str, bronze_dir: str = BRONZE_DIR):
     """
-    Extract all sheets from an Excel file and store them as Parquet files.
+    Extract all sheets or tables from a file and store them as Parquet files.
+
+    The reader is chosen from the file extension, or the file content if the extension is
+    unknown; gzip-compressed files are decompressed while streaming.
 
     Args:
-        file_path (str): Path to the Excel file.
+        file_path (str): Path to the Excel, CSV or JSON Lines file.
         bronze_dir (str): Directory to save the Parquet files.
+
+    Returns:
+        str: Batch directory holding all sheets of this file, or None if any sheet could not be
+        read or saved; the partial batch directory is then removed so a retry starts afresh.
     """
+    batch_dir = None
     try:
-        # Read all sheets into a dictionary of DataFrames
-        all_sheets = pd.read_excel(file_path, sheet_name=None)
-        print(f"[ {datetime.now()} ]-------- Found {len(all_sheets)} sheet(s) in the Excel file.")
+        # Read all sheets into a dictionary of DataFrames or Arrow tables
+        file_format, compression = sniff_format(file_path)
+        all_sheets = READERS[file_format](file_path, compression)
+        print(f"[ {datetime.now()} ]-------- Found {len(all_sheets)} sheet(s) in the {file_format} file.")
 
-        # Save each sheet as a Parquet file
+        # Save each sheet as a Parquet file in one batch directory
+        batch_dir = create_batch_dir(bronze_dir)
         for sheet_name, dataframe in all_sheets.items():
             # print(f"[ {datetime.now()} ]-------- Processing sheet: {sheet_name}")
-            save_to_parquet(sheet_name, dataframe, bronze_dir)
+            # Low-cardinality columns are written dictionary-encoded and numbers downcast
+            if isinstance(dataframe, pa.Table):
+                dataframe = compact_arrow_table(dataframe)
+            else:
+                dataframe = compact_frame_types(dataframe)
+            save_to_parquet(sheet_name, dataframe, bronze_dir, batch_dir)
 
         print(f"[ {datetime.now()} ]-------- All sheets stored in the Bronze layer as Parquet files.")
+        return batch_dir
     except Exception as e:
         print(f"[ {datetime.now()} ]-------- Error during extraction and storage: {e}")
+        if batch_dir:
+            shutil.rmtree(batch_dir, ignore_errors=True)
+        return None
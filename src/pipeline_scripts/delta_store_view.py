@@ -0,0 +1,196 @@
+import os
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from ..utils.file_lock_view import file_lock
+from ..utils.validation_models import get_business_keys_for_table
+
+# Directory to store the per-table row-hash indexes of the last loaded version of each key
+DELTA_INDEX_DIR = os.getenv('DELTA_INDEX_DIR')
+
+
+def _index_path(table_name, index_dir):
+    return os.path.join(index_dir, f"{table_name}_key_hashes.npy")
+
+
+def _normalize_frame(df):
+    normalized = df.rename(columns={
+        col: str(col).replace(" ", "_")
+                     .replace("(", "")
+                     .replace(")", "")
+                     .replace("%", "percent").lower()
+        for col in df.columns
+    })
+    normalized = normalized[sorted(normalized.columns)]
+    for col in normalized.columns:
+        if pd.api.types.is_float_dtype(normalized[col]):
+            normalized[col] = normalized[col].astype(np.float64)
+        elif pd.api.types.is_integer_dtype(normalized[col]):
+            # Hash every integer width alike; nullable integers keep their missing values
+            is_nullable = pd.api.types.is_extension_array_dtype(normalized[col])
+            if pd.api.types.is_unsigned_integer_dtype(normalized[col]):
+                normalized[col] = normalized[col].astype("UInt64" if is_nullable else np.uint64)
+            else:
+                normalized[col] = normalized[col].astype("Int64" if is_nullable else np.int64)
+        elif not (pd.api.types.is_numeric_dtype(normalized[col])
+                  or pd.api.types.is_datetime64_any_dtype(normalized[col])):
+            normalized[col] = normalized[col].astype("string").str.strip()
+    return normalized
+
+
+def compute_row_hashes(df):
+    """
+    Compute a 64-bit hash per row over normalized column names and values.
+
+    Column names are sanitized and sorted and string values are stripped, so cosmetic
+    differences between drops (column order, header spacing, padding) do not change the hash.
+    Numbers are hashed at full width (int64/float64) so compacted and uncompacted drops hash alike.
+
+    Args:
+        df (pd.DataFrame): Bronze DataFrame.
+
+    Returns:
+        np.ndarray: uint64 hash per row, aligned with `df`.
+    """
+    return pd.util.hash_pandas_object(_normalize_frame(df), index=False).to_numpy(dtype=np.uint64)
+
+
+def compute_key_hashes(df, table_name):
+    """
+    Compute a 64-bit hash per row over the table's business key columns.
+
+    Tables without business keys, or drops missing a key column, are keyed by the
+    whole row, so every row version is its own key.
+
+    Args:
+        df (pd.DataFrame): Bronze DataFrame.
+        table_name (str): Name of the table.
+
+    Returns:
+        np.ndarray: uint64 key hash per row, aligned with `df`.
+    """
+    try:
+        key_columns = get_business_keys_for_table(table_name)
+    except ValueError:
+        key_columns = []
+    normalized = _normalize_frame(df)
+    if not key_columns or not set(key_columns) <= set(normalized.columns):
+        return compute_row_hashes(df)
+    return pd.util.hash_pandas_object(normalized[sorted(key_columns)], index=False).to_numpy(dtype=np.uint64)
+
+
+def load_row_hash_index(table_name, index_dir=DELTA_INDEX_DIR):
+    """
+    Load the row-hash index of a table: the hash of the last loaded version of each business key.
+
+    Args:
+        table_name (str): Name of the table.
+        index_dir (str): Directory holding the row-hash indexes.
+
+    Returns:
+        np.ndarray: uint64 array of (key hash, row hash) pairs sorted by key hash
+        (empty if no index exists yet).
+    """
+    path = _index_path(table_name, index_dir)
+    if os.path.exists(path):
+        return np.load(path)
+    return np.empty((0, 2), dtype=np.uint64)
+
+
+def filter_new_or_changed_rows(df, table_name, index_dir=DELTA_INDEX_DIR, include_changed=True):
+    """
+    Keep only the rows whose key is new or whose hash differs from the last loaded version of the key.
+
+    Changed rows can only be applied by a merge load; an append load would add them as second
+    copies of their keys. With `include_changed` False they are dropped, logged and left out
+    of the index, so the index keeps describing the rows actually in the table.
+
+    Args:
+        df (pd.DataFrame): Bronze DataFrame.
+        table_name (str): Name of the table.
+        index_dir (str): Directory holding the row-hash indexes.
+        include_changed (bool): Whether to keep rows whose key was loaded with other values.
+
+    Returns:
+        tuple: (delta_df, delta_hashes) with the new or changed rows and their (key hash, row hash)
+        pairs, aligned with `delta_df`, to commit once they are loaded.
+    """
+    try:
+        hashes = np.column_stack([compute_key_hashes(df, table_name), compute_row_hashes(df)])
+        index = load_row_hash_index(table_name, index_dir)
+
+        if len(index):
+            positions = np.searchsorted(index[:, 0], hashes[:, 0]).clip(max=len(index) - 1)
+            is_unknown_key = index[positions, 0] != hashes[:, 0]
+            is_new = is_unknown_key | (index[positions, 1] != hashes[:, 1])
+        else:
+            is_unknown_key = np.ones(len(hashes), dtype=bool)
+            is_new = is_unknown_key.copy()
+
+        if not include_changed:
+            is_changed = is_new & ~is_unknown_key
+            if is_changed.any():
+                print(f"[ {datetime.now()} ]-------- Skipping {int(is_changed.sum())} changed row(s) of "
+                      f"'{table_name}': corrections are only applied with LOAD_MODE=merge.")
+            is_new &= ~is_changed
+
+        delta_df = df[is_new].reset_index(drop=True)
+        print(f"[ {datetime.now()} ]-------- Delta for '{table_name}': "
+              f"{len(delta_df)} new or changed of {len(df)} row(s).")
+        return delta_df, hashes[is_new]
+    except Exception as e:
+        print(f"[ {datetime.now()} ]-------- Error detecting row delta for '{table_name}': {e}")
+        raise
+
+
+def table_load_lock(table_name, index_dir=DELTA_INDEX_DIR):
+    """
+    Lock held while a drop of the table is filtered against its row-hash index, loaded and committed.
+
+    Two workers filtering different drops against the same index would both find a row new
+    and both load it, so the loads of a table that use the index run one at a time. The lock
+    is kept alive while a load runs and goes stale if its worker dies.
+
+    Args:
+        table_name (str): Name of the table.
+        index_dir (str): Directory holding the row-hash indexes.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    return file_lock(f"{_index_path(table_name, index_dir)}.load.lock", keep_alive=True)
+
+
+def commit_row_hashes(table_name, hashes, index_dir=DELTA_INDEX_DIR):
+    """
+    Record the loaded version of each key in the table's row-hash index, replacing the previous one.
+
+    Call this only after the rows were loaded, so a failed load is retried on the next drop.
+
+    Args:
+        table_name (str): Name of the table.
+        hashes (np.ndarray): uint64 (key hash, row hash) pairs of the loaded rows, in drop order.
+        index_dir (str): Directory holding the row-hash indexes.
+    """
+    try:
+        if not len(hashes):
+            return
+        os.makedirs(index_dir, exist_ok=True)
+        path = _index_path(table_name, index_dir)
+
+        # The last occurrence of a key in the drop is the version that was loaded
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        _, last = np.unique(hashes[::-1, 0], return_index=True)
+        hashes = hashes[len(hashes) - 1 - last]
+
+        with file_lock(f"{path}.lock"):
+            index = load_row_hash_index(table_name, index_dir)
+            index = np.concatenate([index[~np.isin(index[:, 0], hashes[:, 0])], hashes])
+            index = index[np.argsort(index[:, 0], kind="stable")]
+
+            # Write through a temporary file so a crash never leaves a truncated index
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, index)
+            os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"[ {datetime.now()} ]-------- Error updating row-hash index for '{table_name}': {e}")
+        raise
@@ -0,0 +1,465 @@
+import os
+import shutil
+import uuid
+import pandas as pd
+from datetime import datetime
+from ..utils.file_lock_view import file_lock
+
+# Directory to store partial aggregates and gold tables
+GOLD_DIR = os.getenv('GOLD_DIR')
+
+# Partial aggregates maintained per silver table.
+# Each measure keeps sum/count/min/max so every gold metric can be derived
+# from the partials without rescanning the silver history.
+AGGREGATE_SPECS = {
+    "sales_data": {
+        "date_column": "date",
+        "dimensions": ["region", "product", "channel"],
+        "measures": ["quantity", "sales_amount"],
+    },
+    "marketing_campaigns": {
+        "date_column": "start_date",
+        "dimensions": ["channel"],
+        "measures": ["total_reach", "total_conversions", "revenue_generated"],
+    },
+    "product_inventory": {
+        "date_column": None,
+        "dimensions": ["category"],
+        "measures": ["stock_level", "stock_turnover_rate"],
+    },
+}
+
+# Targets are a snapshot table: the latest batch per region replaces the previous one
+TARGET_TABLE = "regional_sales_targets"
+QUARTER_TARGET_COLUMNS = {
+    1: "quarter_1_target",
+    2: "quarter_2_target",
+    3: "quarter_3_target",
+    4: "quarter_4_target",
+}
+
+
+def _partials_path(table_name, gold_dir):
+    return os.path.join(gold_dir, "partials", f"{table_name}_partials.parquet")
+
+
+def _write_parquet_atomic(dataframe, file_path):
+    """
+    Write a DataFrame to Parquet through a temporary file so readers never see a partial file.
+    """
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    tmp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+    dataframe.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, file_path)
+
+
+def _read_parquet_if_exists(file_path):
+    if os.path.exists(file_path):
+        return pd.read_parquet(file_path)
+    return None
+
+
+def compute_batch_partials(df, table_name):
+    """
+    Compute partial aggregates (sum, count, min, max) for one validated silver batch.
+
+    Args:
+        df (pd.DataFrame): Validated rows of the batch.
+        table_name (str): Silver table name.
+
+    Returns:
+        pd.DataFrame: One row per dimension group with `<measure>_sum/_count/_min/_max` columns.
+    """
+    spec = AGGREGATE_SPECS[table_name]
+    keys = list(spec["dimensions"])
+    frame = df[keys + spec["measures"]].copy()
+    # Aggregate compacted (downcast) measures at full width
+    for measure in spec["measures"]:
+        if pd.api.types.is_float_dtype(frame[measure]):
+            frame[measure] = frame[measure].astype("float64")
+        elif pd.api.types.is_integer_dtype(frame[measure]):
+            frame[measure] = frame[measure].astype("int64")
+
+    if spec["date_column"]:
+        dates = pd.to_datetime(df[spec["date_column"]])
+        frame["year"] = dates.dt.year
+        frame["quarter"] = dates.dt.quarter
+        keys = ["year", "quarter"] + keys
+
+    partials = frame.groupby(keys, observed=True, dropna=False).agg(
+        **{
+            f"{measure}_{func}": (measure, func)
+            for measure in spec["measures"]
+            for func in ("sum", "count", "min", "max")
+        }
+    )
+    return partials.reset_index()
+
+
+def merge_partials(existing, batch, table_name):
+    """
+    Combine stored partial aggregates with the partials of a new batch.
+
+    Args:
+        existing (pd.DataFrame | None): Previously stored partials.
+        batch (pd.DataFrame): Partials of the new batch.
+        table_name (str): Silver table name.
+
+    Returns:
+        pd.DataFrame: Combined partials, one row per dimension group.
+    """
+    if existing is None or existing.empty:
+        return batch
+
+    spec = AGGREGATE_SPECS[table_name]
+    keys = [col for col in batch.columns if not col.endswith(("_sum", "_count", "_min", "_max"))]
+    combine = {}
+    for measure in spec["measures"]:
+        combine[f"{measure}_sum"] = "sum"
+        combine[f"{measure}_count"] = "sum"
+        combine[f"{measure}_min"] = "min"
+        combine[f"{measure}_max"] = "max"
+
+    combined = pd.concat([existing, batch], ignore_index=True)
+    return combined.groupby(keys, observed=True, dropna=False).agg(combine).reset_index()
+
+
+def has_aggregates(table_name):
+    """
+    Return True if partial aggregates are maintained for the given table.
+    """
+    return table_name in AGGREGATE_SPECS or table_name == TARGET_TABLE
+
+
+def _folded_partials(df, table_name, existing):
+    """
+    Return the stored partials `existing` (or None) with a batch of silver rows folded in.
+    """
+    if table_name == TARGET_TABLE:
+        latest = df.drop_duplicates(subset=["region"], keep="last")
+        if existing is not None:
+            existing = existing[~existing["region"].isin(latest["region"])]
+            latest = pd.concat([existing, latest[existing.columns]], ignore_index=True)
+        return latest
+    return merge_partials(existing, compute_batch_partials(df, table_name), table_name)
+
+
+def fold_batch_into_aggregates(df, table_name, gold_dir=GOLD_DIR):
+    """
+    Fold a newly validated silver batch into the stored partial aggregates.
+
+    The cost is proportional to the batch plus the (small) partials table,
+    not to the silver history.
+
+    Args:
+        df (pd.DataFrame): Validated rows that were loaded into the silver table.
+        table_name (str): Silver table name.
+        gold_dir (str): Directory holding partials and gold tables.
+
+    Returns:
+        bool: True if the table has aggregates defined and they were updated.
+    """
+    try:
+        if not gold_dir or df.empty:
+            return False
+
+        if not has_aggregates(table_name):
+            return False
+
+        path = _partials_path(table_name, gold_dir)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Workers on several hosts may fold into the same partials
+        with file_lock(f"{path}.lock"):
+            _write_parquet_atomic(_folded_partials(df, table_name, _read_parquet_if_exists(path)), path)
+
+        print(f"[ {datetime.now()} ]-------- Folded {len(df)} row(s) of '{table_name}' into gold partials.")
+        return True
+    except Exception as e:
+        print(f"[ {datetime.now()} ]-------- Error folding '{table_name}' into gold partials: {e}")
+        raise
+
+
+def _group_key_columns(partials):
+    return [col for col in partials.columns if not col.endswith(("_sum", "_count", "_min", "_max"))]
+
+
+def _plain_keys(partials, keys):
+    # Categorical keys with different categories do not align in merges; compare plain values
+    partials = partials.copy()
+    for key in keys:
+        if isinstance(partials[key].dtype, pd.CategoricalDtype):
+            partials[key] = partials[key].astype(object)
+    return partials
+
+
+def correct_aggregates(old_rows, new_rows, table_name, read_group_rows, gold_dir=GOLD_DIR):
+    """
+    Swap the previous values of corrected silver rows for their new values in the stored partials.
+
+    Sums and counts are corrected by subtracting the partials of the old values and adding
+    those of the new values. A min or max can only be subtracted by recomputing it, so the
+    groups where a replaced value was the group's min or max are re-read from silver through
+    `read_group_rows`. The cost is proportional to the corrected rows and the groups they
+    bound, not to the silver history.
+
+    Args:
+        old_rows (pd.DataFrame): Previous values of the corrected rows.
+        new_rows (pd.DataFrame): New values of the corrected rows.
+        table_name (str): Silver table name.
+        read_group_rows (callable): Called as `read_group_rows(groups, date_column)` with a
+            DataFrame of group keys; returns the current silver rows of those groups.
+        gold_dir (str): Directory holding partials and gold tables.
+
+    Returns:
+        bool: True if the table has aggregates defined and they were updated.
+    """
+    try:
+        if not gold_dir or new_rows.empty or not has_aggregates(table_name):
+            return False
+
+        if table_name == TARGET_TABLE:
+            # Targets are a snapshot per region, so the new values simply replace the old ones
+            return fold_batch_into_aggregates(new_rows, table_name, gold_dir)
+
+        spec = AGGREGATE_SPECS[table_name]
+        path = _partials_path(table_name, gold_dir)
+        with file_lock(f"{path}.lock"):
+            existing = _read_parquet_if_exists(path)
+            if existing is None or existing.empty:
+                print(f"[ {datetime.now()} ]-------- No gold partials of '{table_name}' to correct.")
+                return False
+
+            removed = compute_batch_partials(old_rows, table_name)
+            added = compute_batch_partials(new_rows, table_name)
+            keys = _group_key_columns(added)
+
+            # Subtract the old sums and counts; min/max of the old values are left out
+            negated = removed[keys].copy()
+            for measure in spec["measures"]:
+                negated[f"{measure}_sum"] = -removed[f"{measure}_sum"]
+                negated[f"{measure}_count"] = -removed[f"{measure}_count"]
+            corrected = merge_partials(existing, pd.concat([added, negated], ignore_index=True), table_name)
+
+            # Groups where a removed value was the stored min or max must be recomputed
+            bounds = _plain_keys(existing, keys).merge(_plain_keys(removed, keys), on=keys,
+                                                       suffixes=("", "_removed"))
+            stale = pd.Series(False, index=bounds.index)
+            for measure in spec["measures"]:
+                stale |= bounds[f"{measure}_min_removed"] <= bounds[f"{measure}_min"]
+                stale |= bounds[f"{measure}_max_removed"] >= bounds[f"{measure}_max"]
+            stale_groups = bounds.loc[stale, keys].reset_index(drop=True)
+
+            if not stale_groups.empty:
+                fresh = compute_batch_partials(read_group_rows(stale_groups, spec["date_column"]), table_name)
+                corrected = _plain_keys(corrected, keys).merge(stale_groups, on=keys, how="left", indicator=True)
+                corrected = corrected[corrected["_merge"] == "left_only"].drop(columns=["_merge"])
+                corrected = pd.concat([corrected, _plain_keys(fresh, keys)], ignore_index=True)
+
+            # Keep integer min/max integer where the missing old values turned them to floats
+            for column in existing.columns:
+                if (pd.api.types.is_integer_dtype(existing[column]) and column in corrected
+                        and not corrected[column].isna().any()):
+                    corrected[column] = corrected[column].astype(existing[column].dtype)
+            _write_parquet_atomic(corrected, path)
+
+        print(f"[ {datetime.now()} ]-------- Corrected gold partials of '{table_name}' for {len(new_rows)} "
+              f"row(s), {len(stale_groups)} group(s) recomputed.")
+        return True
+    except Exception as e:
+        print(f"[ {datetime.now()} ]-------- Error correcting gold partials of '{table_name}': {e}")
+        raise
+
+
+def _pending_dir(table_name, gold_dir):
+    return os.path.join(gold_dir, "pending", table_name)
+
+
+def record_pending_fold(table_name, inserted_rows, old_rows=None, new_rows=None, gold_dir=GOLD_DIR):
+    """
+    Persist the rows of a Silver load that still have to be folded into the gold partials.
+
+    Recorded before the load is marked as done in the metadata and the delta index, so a
+    fold that fails is retried by `apply_pending_folds` instead of being lost. Each load is
+    written to its own directory, renamed into place once complete.
+
+    Args:
+        table_name (str): Silver table name.
+        inserted_rows (pd.DataFrame): Rows inserted into the silver table.
+        old_rows (pd.DataFrame): Previous values of the corrected rows, if any.
+        new_rows (pd.DataFrame): New values of the corrected rows, if any.
+        gold_dir (str): Directory holding partials and gold tables.
+
+    Returns:
+        str: Path of the pending fold, or None if there is nothing to fold.
+    """
+    try:
+        if not gold_dir or not has_aggregates(table_name):
+            return None
+        frames = {"inserted": inserted_rows, "old": old_rows, "new": new_rows}
+        frames = {role: df for role, df in frames.items() if df is not None and not df.empty}
+        if "new" not in frames:
+            frames.pop("old", None)
+        if not frames:
+            return None
+
+        pending_dir = _pending_dir(table_name, gold_dir)
+        name = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex}"
+        tmp_path = os.path.join(pending_dir, f".{name}.tmp")
+        os.makedirs(tmp_path)
+        for role, df in frames.items():
+            df.to_parquet(os.path.join(tmp_path, f"{role}.parquet"), index=False)
+        path = os.path.join(pending_dir, name)
+        os.rename(tmp_path, path)
+        return path
+    except Exception as e:
+        print(f"[ {datetime.now()} ]-------- Error recording pending gold fold of '{table_name}': {e}")
+        raise
+
+
+def apply_pending_folds(table_name, read_group_rows, gold_dir=GOLD_DIR):
+    """
+    Fold the pending Silver loads of a table into the gold partials, oldest first.
+
+    A pending fold is taken by renaming it, so concurrent workers never fold it twice, and is
+    put back when folding fails so the next load of the table retries it. Inserted rows are
+    dropped from a pending fold as soon as they are folded, so a retry only redoes the rest.
+
+    Args:
+        table_name (str): Silver table name.
+        read_group_rows (callable): Passed to `correct_aggregates` for corrected rows.
+        gold_dir (str): Directory holding partials and gold tables.
+
+    Returns:
+        bool: True if the gold partials of the table were updated.
+    """
+    pending_dir = _pending_dir(table_name, gold_dir) if gold_dir else None
+    if not pending_dir or not os.path.isdir(pending_dir):
+        return False
+
+    folded = False
+    for name in sorted(os.listdir(pending_dir)):
+        # Names starting with a dot are being written or folded
+        if name.startswith("."):
+            continue
+        path = os.path.join(pending_dir, name)
+        taken_path = os.path.join(pending_dir, f".{name}.{uuid.uuid4().hex}.folding")
+        try:
+            os.rename(path, taken_path)
+        except FileNotFoundError:
+            continue
+
+        try:
+            inserted_path = os.path.join(taken_path, "inserted.parquet")
+            if os.path.exists(inserted_path):
+                folded = fold_batch_into_aggregates(pd.read_parquet(inserted_path), table_name, gold_dir) or folded
+                os.remove(inserted_path)
+            new_path = os.path.join(taken_path, "new.parquet")
+            if os.path.exists(new_path):
+                old_rows = pd.read_parquet(os.path.join(taken_path, "old.parquet"))
+                folded = correct_aggregates(old_rows, pd.read_parquet(new_path), table_name,
+                                            read_group_rows, gold_dir) or folded
+        except Exception:
+            os.rename(taken_path, path)
+            print(f"[ {datetime.now()} ]-------- Pending gold fold '{name}' of '{table_name}' kept for a retry.")
+            raise
+        shutil.rmtree(taken_path)
+    return folded
+
+
+def build_sales_vs_target(sales_partials, targets):
+    """
+    Sales by region/quarter compared to the regional quarterly targets.
+    """
+    sales = (
+        sales_partials.groupby(["year", "quarter", "region"], observed=True)
+        .agg(sales_amount=("sales_amount_sum", "sum"),
+             quantity=("quantity_sum", "sum"),
+             order_count=("sales_amount_count", "sum"))
+        .reset_index()
+    )
+    if targets is None or targets.empty:
+        sales["target"] = float("nan")
+    else:
+        quarterly = targets.melt(
+            id_vars=["region"],
+            value_vars=list(QUARTER_TARGET_COLUMNS.values()),
+            var_name="quarter",
+            value_name="target",
+        )
+        quarterly["quarter"] = quarterly["quarter"].map(
+            {column: quarter for quarter, column in QUARTER_TARGET_COLUMNS.items()}
+        )
+        sales = sales.merge(quarterly, on=["region", "quarter"], how="left")
+    sales["attainment_percent"] = sales["sales_amount"] / sales["target"] * 100
+    return sales
+
+
+def build_campaign_performance(campaign_partials):
+    """
+    Campaign revenue, conversion rate and revenue per conversion by channel/quarter.
+    """
+    perf = campaign_partials[["year", "quarter", "channel"]].copy()
+    perf["campaign_count"] = campaign_partials["revenue_generated_count"]
+    perf["total_reach"] = campaign_partials["total_reach_sum"]
+    perf["total_conversions"] = campaign_partials["total_conversions_sum"]
+    perf["revenue_generated"] = campaign_partials["revenue_generated_sum"]
+    reach = perf["total_reach"].where(perf["total_reach"] != 0)
+    conversions = perf["total_conversions"].where(perf["total_conversions"] != 0)
+    perf["conversion_rate_percent"] = perf["total_conversions"] / reach * 100
+    perf["revenue_per_conversion"] = perf["revenue_generated"] / conversions
+    return perf
+
+
+def build_inventory_turnover(inventory_partials):
+    """
+    Average stock turnover and stock levels by category.
+    """
+    turnover = inventory_partials[["category"]].copy()
+    turnover["product_count"] = inventory_partials["stock_level_count"]
+    turnover["total_stock_level"] = inventory_partials["stock_level_sum"]
+    turnover["avg_stock_turnover_rate"] = (
+        inventory_partials["stock_turnover_rate_sum"] / inventory_partials["stock_turnover_rate_count"]
+    )
+    turnover["min_stock_turnover_rate"] = inventory_partials["stock_turnover_rate_min"]
+    turnover["max_stock_turnover_rate"] = inventory_partials["stock_turnover_rate_max"]
+    return turnover
+
+
+def refresh_gold_tables(gold_dir=GOLD_DIR):
+    """
+    Rebuild the dashboard-facing gold tables from the stored partial aggregates.
+
+    Args:
+        gold_dir (str): Directory holding partials and gold tables.
+
+    Returns:
+        list: Names of the gold tables that were written.
+    """
+    try:
+        if not gold_dir:
+            return []
+
+        written = []
+        sales = _read_parquet_if_exists(_partials_path("sales_data", gold_dir))
+        targets = _read_parquet_if_exists(_partials_path(TARGET_TABLE, gold_dir))
+        campaigns = _read_parquet_if_exists(_partials_path("marketing_campaigns", gold_dir))
+        inventory = _read_parquet_if_exists(_partials_path("product_inventory", gold_dir))
+
+        if sales is not None:
+            _write_parquet_atomic(build_sales_vs_target(sales, targets),
+                                  os.path.join(gold_dir, "gold_sales_vs_target.parquet"))
+            written.append("gold_sales_vs_target")
+        if campaigns is not None:
+            _write_parquet_atomic(build_campaign_performance(campaigns),
+                                  os.path.join(gold_dir, "gold_campaign_performance.parquet"))
+            written.append("gold_campaign_performance")
+        if inventory is not None:
+            _write_parquet_atomic(build_inventory_turnover(inventory),
+                                  os.path.join(gold_dir, "gold_inventory_turnover.parquet"))
+            written.append("gold_inventory_turnover")
+
+        print(f"[ {datetime.now()} ]-------- Refreshed gold tables: {', '.join(written) or 'none'}")
+        return written
+    except Exception as e:
+        print(f"[ {datetime.now()} ]-------- Error refreshing gold tables: {e}")
+        raise
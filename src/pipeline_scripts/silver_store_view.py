@@ -1,12 +1,56 @@
+from contextlib import nullcontext
 from datetime import datetime
+from functools import partial
 import os
+import numpy as np
 import pandas as pd
 from sqlalchemy import create_engine, text
 from ..utils.db_param_view import SQL_SERVER_CONNECTION_STRING
 from ..utils.manage_schema_view import ensure_table_exists
 from ..utils.metadata_view import is_sheet_processed, update_metadata
 from ..utils.validate_view import split_and_handle_invalid_rows_generic
-from ..utils.validation_models import get_pydantic_model_for_table
+from ..utils.validation_models import get_business_keys_for_table, get_pydantic_model_for_table
+from ..utils.work_claim_view import CLAIM_CONNECTION_STRING, claimed, set_claim_detail
+from .bronze_compaction_view import mark_bronze_file_loaded
+from .delta_store_view import DELTA_INDEX_DIR, commit_row_hashes, filter_new_or_changed_rows, table_load_lock
+from .gold_store_view import GOLD_DIR, apply_pending_folds, record_pending_fold, refresh_gold_tables
+
+# Load mode for the Silver layer: 'append' (plain INSERT) or 'merge' (key-based upsert)
+LOAD_MODE = os.getenv('LOAD_MODE', 'append')
+
+# Staging column carrying the DataFrame position of each row through the merge
+STAGE_ROW_COLUMN = "_stage_row"
+
+
+def sanitize_column_name(col):
+    return (col.replace(" ", "_")
+               .replace("(", "")
+               .replace(")", "")
+               .replace("%", "percent"))
+
+
+def sql_value(value):
+    """
+    Convert a DataFrame value to a type every DBAPI driver binds: Python datetimes for
+    Timestamps, Python scalars for NumPy scalars and None for missing values.
+    """
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def sql_rows(df, sanitized_columns):
+    """
+    Convert a DataFrame to a list of parameter dictionaries keyed by sanitized column name.
+    """
+    return [
+        {sanitized_columns[col]: sql_value(value) for col, value in row.items()}
+        for row in df.to_dict(orient="records")
+    ]
 
 
 def bulk_insert(df, table_name, connection_string):
@@ -20,14 +64,7 @@ def bulk_insert(df, table_name, connection_string):
     """
     try:
         # Sanitize column names
-        sanitized_columns = {
-            col: col.replace(" ", "_")
-                   .replace("(", "")
-                   .replace(")", "")
-                   .replace("%", "percent")
-            for col in df.columns
-        }
-        sanitized_df = df.rename(columns=sanitized_columns)
+        sanitized_columns = {col: sanitize_column_name(col) for col in df.columns}
 
         # Properly quote column names
         columns = ", ".join([f"[{col}]" for col in sanitized_columns.values()])
@@ -35,10 +72,7 @@ def bulk_insert(df, table_name, connection_string):
         insert_query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
 
         # Convert sanitized DataFrame to a list of dictionaries (rows)
-        rows = [
-            {sanitized_columns[col]: value for col, value in row.items()}
-            for row in df.to_dict(orient="records")
-        ]
+        rows = sql_rows(df, sanitized_columns)
 
         # Debug: Print the generated query and rows
         # print(f"[ {datetime.now()} ]-------- Executing bulk insert:\n{insert_query}")
@@ -55,6 +89,183 @@ def bulk_insert(df, table_name, connection_string):
         raise
 
 
+def merge_upsert(df, table_name, key_columns, connection_string):
+    """
+    Upsert a DataFrame into a table by business key through a staging table.
+
+    The rows are bulk-loaded into a temporary staging table and applied with a single
+    set-based MERGE on SQL Server (UPDATE + INSERT on other dialects such as a local
+    SQLite stand-in). Only rows whose values differ from the target are updated, and the
+    values they replace are returned so aggregates can be corrected incrementally.
+
+    Args:
+        df (pd.DataFrame): DataFrame to upsert.
+        table_name (str): Target table name.
+        key_columns (list): Business key columns identifying a row.
+        connection_string (str): SQLAlchemy connection string.
+
+    Returns:
+        tuple: (inserted_rows, updated_rows, replaced_rows) where inserted_rows and
+        updated_rows are the subsets of `df` that were inserted and updated, and
+        replaced_rows holds the previous values of the updated rows, in the same order.
+    """
+    try:
+        # Keep the last occurrence of each key so the staging table has unique keys
+        df = df.drop_duplicates(subset=key_columns, keep="last").reset_index(drop=True)
+
+        sanitized_columns = {col: sanitize_column_name(col) for col in df.columns}
+        columns = list(sanitized_columns.values())
+        keys = [sanitize_column_name(col) for col in key_columns]
+        non_keys = [col for col in columns if col not in keys]
+
+        column_list = ", ".join([f"[{col}]" for col in columns])
+        on_clause = " AND ".join([f"target.[{col}] = source.[{col}]" for col in keys])
+
+        rows = [
+            {**row, STAGE_ROW_COLUMN: position}
+            for position, row in enumerate(sql_rows(df, sanitized_columns))
+        ]
+
+        engine = create_engine(connection_string)
+        is_mssql = engine.dialect.name == "mssql"
+        staging_table = f"#{table_name}_staging" if is_mssql else f"{table_name}_staging"
+
+        with engine.connect() as conn:
+            # Create an empty staging table with the target's column types
+            if is_mssql:
+                conn.execute(text(f"SELECT TOP 0 {column_list} INTO [{staging_table}] FROM [{table_name}]"))
+            else:
+                conn.execute(text(f"DROP TABLE IF EXISTS [{staging_table}]"))
+                conn.execute(text(
+                    f"CREATE TEMP TABLE [{staging_table}] AS SELECT {column_list} FROM [{table_name}] WHERE 0 = 1"
+                ))
+            conn.execute(text(f"ALTER TABLE [{staging_table}] ADD [{STAGE_ROW_COLUMN}] BIGINT"))
+
+            # Bulk-load the staging table
+            stage_columns = column_list + f", [{STAGE_ROW_COLUMN}]"
+            stage_placeholders = ", ".join([f":{col}" for col in columns] + [f":{STAGE_ROW_COLUMN}"])
+            conn.execute(
+                text(f"INSERT INTO [{staging_table}] ({stage_columns}) VALUES ({stage_placeholders})"),
+                rows,
+            )
+
+            if is_mssql:
+                # Rows differ when the source values are not all equal (NULL-safe) to the target values
+                changed = (
+                    f"EXISTS (SELECT {', '.join([f'source.[{col}]' for col in non_keys])} "
+                    f"EXCEPT SELECT {', '.join([f'target.[{col}]' for col in non_keys])})"
+                )
+                update_clause = (
+                    f"WHEN MATCHED AND {changed} THEN UPDATE SET "
+                    + ", ".join([f"target.[{col}] = source.[{col}]" for col in non_keys])
+                    if non_keys else ""
+                )
+                merge_query = f"""
+                    MERGE INTO [{table_name}] AS target
+                    USING [{staging_table}] AS source
+                    ON {on_clause}
+                    {update_clause}
+                    WHEN NOT MATCHED BY TARGET THEN
+                        INSERT ({column_list})
+                        VALUES ({", ".join([f"source.[{col}]" for col in columns])})
+                    OUTPUT $action, source.[{STAGE_ROW_COLUMN}], {", ".join([f"deleted.[{col}]" for col in columns])};
+                """
+                actions = conn.execute(text(merge_query)).fetchall()
+                inserted_positions = [row[1] for row in actions if row[0] == "INSERT"]
+                replaced = [tuple(row[1:]) for row in actions if row[0] == "UPDATE"]
+            else:
+                replaced = []
+                if non_keys:
+                    # Capture the values about to be replaced
+                    replaced = [tuple(row) for row in conn.execute(text(f"""
+                        SELECT source.[{STAGE_ROW_COLUMN}], {", ".join([f"target.[{col}]" for col in columns])}
+                        FROM [{staging_table}] AS source
+                        JOIN [{table_name}] AS target ON {on_clause}
+                        WHERE {" OR ".join([f"target.[{col}] IS NOT source.[{col}]" for col in non_keys])};
+                    """))]
+                    update_query = f"""
+                        UPDATE [{table_name}] AS target
+                        SET {", ".join([f"[{col}] = source.[{col}]" for col in non_keys])}
+                        FROM [{staging_table}] AS source
+                        WHERE {on_clause}
+                          AND ({" OR ".join([f"target.[{col}] IS NOT source.[{col}]" for col in non_keys])});
+                    """
+                    conn.execute(text(update_query))
+
+                new_rows_filter = (
+                    f"FROM [{staging_table}] AS source WHERE NOT EXISTS "
+                    f"(SELECT 1 FROM [{table_name}] AS target WHERE {on_clause})"
+                )
+                inserted_positions = [
+                    row[0] for row in conn.execute(text(f"SELECT source.[{STAGE_ROW_COLUMN}] {new_rows_filter}"))
+                ]
+                conn.execute(text(
+                    f"INSERT INTO [{table_name}] ({column_list}) "
+                    f"SELECT {', '.join([f'source.[{col}]' for col in columns])} {new_rows_filter}"
+                ))
+
+            conn.execute(text(f"DROP TABLE [{staging_table}]"))
+            conn.commit()
+
+        replaced = sorted(replaced, key=lambda row: row[0])
+        inserted_rows = df.iloc[sorted(inserted_positions)]
+        updated_rows = df.iloc[[row[0] for row in replaced]]
+        replaced_rows = pd.DataFrame([row[1:] for row in replaced], columns=columns)
+        print(f"[ {datetime.now()} ]-------- Merged into '{table_name}': "
+              f"{len(inserted_rows)} inserted, {len(updated_rows)} updated, "
+              f"{len(df) - len(inserted_rows) - len(updated_rows)} unchanged.")
+        return inserted_rows, updated_rows, replaced_rows
+    except Exception as e:
+        print(f"[ {datetime.now()} ]-------- Error during merge upsert: {e}")
+        raise
+
+
+def read_table_groups(table_name, groups, date_column, connection_string, chunk_size=100):
+    """
+    Read the Silver rows of the given aggregate groups instead of the full table.
+
+    Args:
+        table_name (str): Silver table name.
+        groups (pd.DataFrame): One row per group with its dimension values, plus `year` and
+            `quarter` when the table has a date column.
+        date_column (str): Date column the year/quarter were derived from, or None.
+        connection_string (str): SQLAlchemy connection string.
+        chunk_size (int): Groups per query, keeping the parameter count within driver limits.
+
+    Returns:
+        pd.DataFrame: Rows of the groups.
+    """
+    frames = []
+    engine = create_engine(connection_string)
+    records = groups.to_dict(orient="records")
+    with engine.connect() as conn:
+        for start in range(0, len(records), chunk_size):
+            conditions, params = [], {}
+            for i, group in enumerate(records[start:start + chunk_size]):
+                clauses = []
+                for col, value in group.items():
+                    if date_column and col in ("year", "quarter"):
+                        continue
+                    if pd.isna(value):
+                        clauses.append(f"[{col}] IS NULL")
+                    else:
+                        params[f"g{i}_{col}"] = sql_value(value)
+                        clauses.append(f"[{col}] = :g{i}_{col}")
+                if date_column and pd.isna(group["year"]):
+                    clauses.append(f"[{date_column}] IS NULL")
+                elif date_column:
+                    # The quarter's date range, so an index on the date column can be used
+                    quarter_start = datetime(int(group["year"]), 3 * int(group["quarter"]) - 2, 1)
+                    quarter_end = (datetime(quarter_start.year + 1, 1, 1) if quarter_start.month == 10
+                                   else datetime(quarter_start.year, quarter_start.month + 3, 1))
+                    params[f"g{i}_start"], params[f"g{i}_end"] = quarter_start, quarter_end
+                    clauses.append(f"[{date_column}] >= :g{i}_start AND [{date_column}] < :g{i}_end")
+                conditions.append("(" + " AND ".join(clauses or ["1 = 1"]) + ")")
+            query = f"SELECT * FROM [{table_name}] WHERE {' OR '.join(conditions)}"
+            frames.append(pd.read_sql(text(query), conn, params=params))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
 def get_highest_timestamp(connection_string):
     """
     Retrieve the highest `last_processed_time` from the metadata table.
@@ -82,17 +293,213 @@ def get_highest_timestamp(connection_string):
         raise
     
 
-def transform_bronze_to_silver_with_metadata(bronze_dir, parent_file_path, connection_string=SQL_SERVER_CONNECTION_STRING):
+def load_bronze_table(df, table_name, batch_dir, parent_file_path, source_name,
+                      connection_string=SQL_SERVER_CONNECTION_STRING, gold_dir=GOLD_DIR,
+                      load_mode=LOAD_MODE, delta_index_dir=DELTA_INDEX_DIR, claim=None):
+    """
+    Validate one Bronze table and load its valid rows into the Silver layer.
+
+    Args:
+        df (pd.DataFrame): Bronze rows of the table.
+        table_name (str): Target table name.
+        batch_dir (str): Batch directory where invalid rows are saved.
+        parent_file_path (str): Path to the original file, recorded in the metadata.
+        source_name (str): Name of the Bronze file, used in log messages.
+        connection_string (str): SQL Server connection string.
+        gold_dir (str): Directory for gold partial aggregates; disabled when not set.
+        load_mode (str): 'append' to insert every valid row, 'merge' to upsert by business key.
+        delta_index_dir (str): Directory for the per-table row-hash indexes; disabled when not set.
+        claim (Claim): Claim held on the work, checked before writing; None when claiming is disabled.
+
+    Returns:
+        bool: True if the gold partial aggregates of the table were updated.
+    """
+    # The delta is detected, loaded and committed by one worker per table at a time: two
+    # workers filtering against the same index would both load the rows new to it
+    load_lock = table_load_lock(table_name, delta_index_dir) if delta_index_dir else nullcontext()
+    with load_lock:
+        # Pending gold folds left by a failed load of the table are retried on every load
+        read_groups = partial(read_table_groups, table_name, connection_string=connection_string)
+
+        # Keep only rows that are new or changed since the previous drops;
+        # an append load only takes new keys, as it cannot apply corrections
+        row_hashes = []
+        if delta_index_dir:
+            df, row_hashes = filter_new_or_changed_rows(df, table_name, delta_index_dir,
+                                                        include_changed=load_mode == "merge")
+            if df.empty:
+                print(f"[ {datetime.now()} ]-------- No new or changed rows in '{source_name}'. Skipping table '{table_name}'.")
+                return apply_pending_folds(table_name, read_groups, gold_dir)
+
+        model = get_pydantic_model_for_table(table_name)
+        valid_rows = split_and_handle_invalid_rows_generic(df, model, table_name, batch_dir)
+
+        # Only rows that pass validation reach the table: the index must not record the invalid
+        # ones, so their correction in a later drop is loaded as a new row
+        if delta_index_dir:
+            row_hashes = row_hashes[np.asarray(valid_rows.index, dtype=np.intp)]
+
+        if valid_rows.empty:
+            print(f"[ {datetime.now()} ]-------- All rows in '{source_name}' are invalid. Skipping table '{table_name}'.")
+            return apply_pending_folds(table_name, read_groups, gold_dir)
+
+        # Load data row count
+        row_count = len(valid_rows)
+
+        # Check if already processed; a merge is idempotent so re-sent files are re-applied
+        if load_mode != "merge" and is_sheet_processed(parent_file_path, table_name, row_count, connection_string):
+            print(f"[ {datetime.now()} ]------------------- Skipping {table_name} from {source_name}: already processed.")
+            if delta_index_dir:
+                commit_row_hashes(table_name, row_hashes, delta_index_dir)
+            return apply_pending_folds(table_name, read_groups, gold_dir)
+
+        # Do not write if the lease was lost: another worker may be loading the same file
+        if claim is not None:
+            claim.ensure_held()
+
+        # Ensure the table exists
+        ensure_table_exists(valid_rows, table_name, connection_string)
+
+        if load_mode == "merge":
+            # Upsert valid data by business key
+            key_columns = get_business_keys_for_table(table_name)
+            inserted_rows, updated_rows, replaced_rows = merge_upsert(valid_rows, table_name, key_columns,
+                                                                      connection_string)
+        else:
+            # Insert valid data
+            bulk_insert(valid_rows, table_name, connection_string)
+            inserted_rows, updated_rows, replaced_rows = valid_rows, None, None
+
+        # Record the gold fold before the load is marked as done: a retry would find the rows
+        # already processed or unchanged, so a fold failing after that would be lost
+        record_pending_fold(table_name, inserted_rows, replaced_rows, updated_rows, gold_dir)
+
+        # Update metadata
+        update_metadata(parent_file_path, table_name, row_count, connection_string)
+
+        # Remember the loaded rows so the next drop only carries what changed
+        if delta_index_dir:
+            commit_row_hashes(table_name, row_hashes, delta_index_dir)
+
+        # Fold the new rows into the gold partials and swap the replaced values of corrected rows
+        # for their new ones
+        return apply_pending_folds(table_name, read_groups, gold_dir)
+
+
+def bronze_work_key(file_path):
+    """
+    Claim key of a Bronze Parquet file, identical on every host sharing the Bronze directory.
+    """
+    return f"bronze:{os.path.basename(os.path.dirname(file_path))}/{os.path.basename(file_path)}"
+
+
+def process_bronze_file(file_path, parent_file_path, connection_string=SQL_SERVER_CONNECTION_STRING,
+                        gold_dir=GOLD_DIR, load_mode=LOAD_MODE, delta_index_dir=DELTA_INDEX_DIR,
+                        claim_connection_string=CLAIM_CONNECTION_STRING):
+    """
+    Load one Bronze Parquet file into the Silver layer.
+
+    When work claiming is enabled, the file is only loaded by the worker that wins its claim,
+    so workers sharing the Bronze directory load every file exactly once.
+
+    Args:
+        file_path (str): Path to the Parquet file in a batch directory.
+        parent_file_path (str): Path to the original file, recorded in the metadata.
+        connection_string (str): SQL Server connection string.
+        gold_dir (str): Directory for gold partial aggregates; disabled when not set.
+        load_mode (str): 'append' to insert every valid row, 'merge' to upsert by business key.
+        delta_index_dir (str): Directory for the per-table row-hash indexes; disabled when not set.
+        claim_connection_string (str): Claims database; work claiming is disabled when not set.
+
+    Returns:
+        bool: True if the gold partial aggregates of the table were updated.
+    """
+    dir_path, file_name = os.path.split(file_path)
+    table_name = os.path.splitext(file_name)[0].replace(" ", "_").lower()
+
+    work_key = bronze_work_key(file_path)
+    claim_context = claimed(work_key, "bronze", connection_string=claim_connection_string) \
+        if claim_connection_string else nullcontext(None)
+    with claim_context as claim:
+        if claim_connection_string and not claim:
+            print(f"[ {datetime.now()} ]-------- Skipping {file_name}: claimed by another worker or already loaded.")
+            return False
+        if claim_connection_string:
+            # Keep the parent file so a reclaim records the same metadata
+            set_claim_detail(work_key, parent_file_path, connection_string=claim_connection_string)
+
+        # Load data
+        df = pd.read_parquet(file_path)
+        folded = load_bronze_table(df, table_name, dir_path, parent_file_path, file_name,
+                                   connection_string, gold_dir, load_mode, delta_index_dir, claim)
+
+        # Only loaded files may be compacted
+        mark_bronze_file_loaded(file_path)
+        return folded
+
+
+def process_bronze_batch(dir_path, parent_file_path, connection_string=SQL_SERVER_CONNECTION_STRING,
+                         gold_dir=GOLD_DIR, load_mode=LOAD_MODE, delta_index_dir=DELTA_INDEX_DIR,
+                         claim_connection_string=CLAIM_CONNECTION_STRING):
+    """
+    Load every Parquet file of one Bronze batch directory into the Silver layer.
+
+    Args:
+        dir_path (str): Path to the timestamped batch directory.
+        parent_file_path (str): Path to the original file, recorded in the metadata.
+        connection_string (str): SQL Server connection string.
+        gold_dir (str): Directory for gold partial aggregates; disabled when not set.
+        load_mode (str): 'append' to insert every valid row, 'merge' to upsert by business key.
+        delta_index_dir (str): Directory for the per-table row-hash indexes; disabled when not set.
+        claim_connection_string (str): Claims database; work claiming is disabled when not set.
+
+    Returns:
+        tuple: (folded_tables, failed_files) with the tables whose gold partials were updated
+        and the Parquet files that could not be processed.
+    """
+    folded_tables = []
+    failed_files = []
+    print(f"[ {datetime.now()} ]-------- Processing directory: {dir_path}")
+
+    for file_name in os.listdir(dir_path):
+        if file_name.endswith('.parquet'):
+            try:
+                file_path = os.path.join(dir_path, file_name)
+                if process_bronze_file(file_path, parent_file_path, connection_string, gold_dir,
+                                       load_mode, delta_index_dir, claim_connection_string):
+                    folded_tables.append(os.path.splitext(file_name)[0].replace(" ", "_").lower())
+
+            except Exception as file_error:
+                print(f"[ {datetime.now()} ]-------- Error processing file {file_name}: {file_error}")
+                failed_files.append(file_name)
+                continue
+
+    return folded_tables, failed_files
+
+
+def transform_bronze_to_silver_with_metadata(bronze_dir, parent_file_path, connection_string=SQL_SERVER_CONNECTION_STRING,
+                                             gold_dir=GOLD_DIR, load_mode=LOAD_MODE,
+                                             delta_index_dir=DELTA_INDEX_DIR):
     """
     Process data from the Bronze layer to the Silver layer using metadata for incremental loading,
     and handle invalid rows by saving them in an 'invalids' subdirectory.
 
+    When a delta index directory is set, only rows that are new or changed since the
+    previous drops are validated and loaded. Loaded rows are folded into the gold
+    partial aggregates and the gold tables are refreshed once all new batches have
+    been processed.
+
     Args:
         bronze_dir (str): Path to the Bronze directory containing Parquet files.
         parent_file_path (str): Path to the original Excel file.
         connection_string (str): SQL Server connection string.
+        gold_dir (str): Directory for gold partial aggregates; disabled when not set.
+        load_mode (str): 'append' to insert every valid row, 'merge' to upsert by business key.
+        delta_index_dir (str): Directory for the per-table row-hash indexes; disabled when not set.
     """
     try:
+        folded_tables = []
+
         # Get the highest timestamp from metadata
         highest_timestamp = get_highest_timestamp(connection_string)
         print(f"[ {datetime.now()} ]-------- Highest processed timestamp: {highest_timestamp}")
@@ -108,43 +515,12 @@ def transform_bronze_to_silver_with_metadata(bronze_dir, parent_file_path, conne
 
         for timestamp_dir in timestamped_dirs:
             dir_path = os.path.join(bronze_dir, timestamp_dir)
-            print(f"[ {datetime.now()} ]-------- Processing directory: {dir_path}")
-
-            for file_name in os.listdir(dir_path):
-                if file_name.endswith('.parquet'):
-                    try:
-                        file_path = os.path.join(dir_path, file_name)
-                        table_name = os.path.splitext(file_name)[0].replace(" ", "_").lower()
-
-                        # Load data
-                        df = pd.read_parquet(file_path)
-                        model = get_pydantic_model_for_table(table_name)                
-                        valid_rows = split_and_handle_invalid_rows_generic(df, model, table_name, dir_path)
+            batch_folded, _ = process_bronze_batch(dir_path, parent_file_path, connection_string,
+                                                   gold_dir, load_mode, delta_index_dir)
+            folded_tables.extend(batch_folded)
 
-                        if valid_rows.empty:
-                            print(f"[ {datetime.now()} ]-------- All rows in '{file_name}' are invalid. Skipping table '{table_name}'.")
-                            continue
-
-                        # Load data row count
-                        row_count = len(valid_rows)
-
-                        # Check if already processed
-                        if is_sheet_processed(parent_file_path, table_name, row_count, connection_string):
-                            print(f"[ {datetime.now()} ]------------------- Skipping {table_name} from {file_name}: already processed.")
-                            continue
-
-                        # Ensure the table exists
-                        ensure_table_exists(valid_rows, table_name, connection_string)
-
-                        # Insert valid data
-                        bulk_insert(valid_rows, table_name, connection_string)
-
-                        # Update metadata
-                        update_metadata(parent_file_path, table_name, row_count, connection_string)
-
-                    except Exception as file_error:
-                        print(f"[ {datetime.now()} ]-------- Error processing file {file_name}: {file_error}")
-                        continue
+        if folded_tables:
+            refresh_gold_tables(gold_dir)
 
     except Exception as e:
         print(f"[ {datetime.now()} ]-------- Error processing Bronze to Silver: {e}")
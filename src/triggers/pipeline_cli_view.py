@@ -0,0 +1,405 @@
+"""
+Command line entry point of the data pipeline.
+
+Usage:
+    python -m src watch [--path RAW_STORE_DIR]
+    python -m src ingest FILE
+    python -m src backfill DIRECTORY_OR_GLOB [--workers N]
+    python -m src replay-bronze [--since TIMESTAMP] [--until TIMESTAMP] [--workers N]
+    python -m src compact [--retention-days N] [--retention-max-gb N]
+
+Only argparse is imported at startup; pandas, SQLAlchemy, pyodbc and watchdog are imported
+inside the subcommand that needs them so `--help` and small commands start fast.
+"""
+import argparse
+import glob
+import importlib
+import json
+import os
+import sys
+from datetime import datetime
+
+# Default state file recording the workbooks already loaded by `backfill`
+BACKFILL_STATE_FILE = ".backfill_state.jsonl"
+
+
+def _pipeline_options(args):
+    """
+    Keyword arguments for the Silver stage taken from the command line, leaving defaults unset.
+    """
+    options = {}
+    if args.connection_string:
+        options["connection_string"] = args.connection_string
+    if args.load_mode:
+        options["load_mode"] = args.load_mode
+    return options
+
+
+# -----------------------------------------------
+# Process pool workers (module level so they can be pickled)
+# -----------------------------------------------
+def _ingest_file(file_path, bronze_dir, options, gold_dir=None):
+    """
+    Extract one file into its own Bronze batch and load that batch into the Silver layer.
+
+    Returns:
+        tuple: (batch directory, folded tables)
+    """
+    from ..pipeline_scripts.silver_store_view import process_bronze_batch
+
+    _, batch_dir = _extract_file(file_path, bronze_dir)
+    folded_tables, failed_files = process_bronze_batch(batch_dir, file_path, gold_dir=gold_dir, **options)
+    if failed_files:
+        raise RuntimeError(f"Loading failed for {', '.join(failed_files)} of batch '{batch_dir}'")
+    return batch_dir, folded_tables
+
+
+def _extract_file(file_path, bronze_dir):
+    """
+    Extract one file into its own Bronze batch directory.
+
+    Returns:
+        tuple: (file path, batch directory)
+    """
+    from ..pipeline_scripts.bronze_store_view import extract_and_store_bronze
+
+    batch_dir = extract_and_store_bronze(file_path, bronze_dir)
+    if batch_dir is None:
+        raise RuntimeError(f"Extraction of '{file_path}' failed")
+    return file_path, batch_dir
+
+
+def _load_table_sources(table_name, sources, since, until, options, gold_dir=None):
+    """
+    Load the Bronze sources of one table into the Silver layer, oldest first.
+
+    Each table is loaded by a single worker so later batches are always applied after
+    earlier ones, which keeps merge-mode corrections in order. Each load is folded into
+    the table's gold partials as it goes, so no Silver table is rescanned afterwards.
+
+    Args:
+        table_name (str): Target table name.
+        sources (list): (kind, path, parent) tuples. For kind 'batch', path is a Parquet file
+            in a batch directory and parent the original file recorded in the metadata; for
+            kind 'compacted', path is a compacted Bronze file and parent the Bronze directory.
+        since (str): First batch to load from compacted files; no lower bound if None.
+        until (str): Last batch to load from compacted files; no upper bound if None.
+        options (dict): Keyword arguments for the Silver stage.
+        gold_dir (str): Directory for gold partial aggregates; disabled when not set.
+
+    Returns:
+        dict: Table name, paths loaded, whether the gold partials were updated and the error
+        that stopped the table, if any.
+    """
+    import pandas as pd
+    from ..pipeline_scripts.bronze_compaction_view import SOURCE_BATCH_COLUMN, mark_bronze_file_loaded
+    from ..pipeline_scripts.silver_store_view import load_bronze_table
+
+    loaded = []
+    folded = False
+    try:
+        for kind, path, parent_file_path in sources:
+            df = pd.read_parquet(path)
+            if kind == "batch":
+                folded = load_bronze_table(df, table_name, os.path.dirname(path), parent_file_path,
+                                           os.path.basename(path), gold_dir=gold_dir, **options) or folded
+                mark_bronze_file_loaded(path)
+            else:
+                for batch_name, batch_rows in df.groupby(SOURCE_BATCH_COLUMN, observed=True, sort=True):
+                    if (since and batch_name < since) or (until and batch_name > until):
+                        continue
+                    batch_dir = os.path.join(parent_file_path, batch_name)
+                    batch_rows = batch_rows.drop(columns=[SOURCE_BATCH_COLUMN]).reset_index(drop=True)
+                    folded = load_bronze_table(batch_rows, table_name, batch_dir, batch_dir, os.path.basename(path),
+                                               gold_dir=gold_dir, **options) or folded
+            loaded.append(path)
+        return {"table": table_name, "loaded": loaded, "folded": folded, "error": None}
+    except Exception as e:
+        return {"table": table_name, "loaded": loaded, "folded": folded, "error": str(e)}
+
+
+def _run_in_pool(tasks, workers, on_done=None):
+    """
+    Run (label, function, args) tasks on a process pool and report progress.
+
+    Returns:
+        tuple: (results of the successful tasks, labels of the failed tasks)
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    results, failed = [], []
+    total = len(tasks)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(function, *task_args): label for label, function, task_args in tasks}
+        for completed, future in enumerate(as_completed(futures), start=1):
+            label = futures[future]
+            try:
+                result = future.result()
+                if on_done:
+                    on_done(label, result)
+                if isinstance(result, dict) and result.get("error"):
+                    raise RuntimeError(result["error"])
+                results.append(result)
+            except Exception as e:
+                failed.append(label)
+                print(f"[ {datetime.now()} ]-------- Failed {label}: {e}")
+            print(f"[ {datetime.now()} ]-------- Progress: {completed}/{total} done, {len(failed)} failed.")
+    return results, failed
+
+
+def _table_tasks(sources_by_table, since, until, options, gold_dir=None):
+    return [
+        (table_name, _load_table_sources, (table_name, sources, since, until, options, gold_dir))
+        for table_name, sources in sorted(sources_by_table.items())
+    ]
+
+
+def _batch_sources(batch_dir, parent_file_path, sources_by_table, skip=()):
+    """
+    Add the Parquet files of a Bronze batch directory to the per-table source lists.
+    """
+    for file_name in sorted(os.listdir(batch_dir)):
+        file_path = os.path.join(batch_dir, file_name)
+        if file_name.endswith('.parquet') and file_path not in skip:
+            table_name = os.path.splitext(file_name)[0].replace(" ", "_").lower()
+            sources_by_table.setdefault(table_name, []).append(("batch", file_path, parent_file_path))
+
+
+def _refresh_gold(results, gold_dir):
+    """
+    Rebuild the gold tables once after a parallel run if any worker folded into the partials.
+    """
+    from ..pipeline_scripts.gold_store_view import refresh_gold_tables
+
+    if any(result["folded"] for result in results):
+        refresh_gold_tables(gold_dir)
+
+
+# -----------------------------------------------
+# Subcommands
+# -----------------------------------------------
+def cmd_watch(args):
+    watcher = importlib.import_module(".watchdog-monitor_view", __package__)
+    watcher.start_watcher(args.path or watcher.RAW_STORE_DIR, args.bronze_dir)
+
+
+def cmd_ingest(args):
+    from ..pipeline_scripts.gold_store_view import GOLD_DIR, refresh_gold_tables
+
+    _, folded_tables = _ingest_file(args.file, args.bronze_dir, _pipeline_options(args), GOLD_DIR)
+    if folded_tables:
+        refresh_gold_tables(GOLD_DIR)
+
+
+def _resolve_sources(source, pattern):
+    if os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, "**", pattern), recursive=True)
+    else:
+        paths = glob.glob(source, recursive=True)
+    return sorted(os.path.abspath(path) for path in paths if os.path.isfile(path))
+
+
+def _file_signature(file_path):
+    stat = os.stat(file_path)
+    return {"file": file_path, "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def _load_backfill_state(state_file):
+    """
+    Read the backfill state file.
+
+    Returns:
+        tuple: (extracted, loaded) where extracted maps (file, size, mtime) to its Bronze batch
+        directory and loaded is the set of Bronze Parquet files already loaded.
+    """
+    extracted, loaded = {}, set()
+    if os.path.exists(state_file):
+        with open(state_file) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if "file" in entry:
+                    extracted[(entry["file"], entry["size"], entry["mtime"])] = entry["batch_dir"]
+                else:
+                    loaded.add(entry["loaded"])
+    return extracted, loaded
+
+
+def _append_state(state_file, entry):
+    # Append each finished step right away so an interrupted backfill resumes where it stopped
+    with open(state_file, "a") as f:
+        f.write(json.dumps({**entry, "finished": datetime.now().isoformat()}) + "\n")
+
+
+def cmd_backfill(args):
+    from ..pipeline_scripts.gold_store_view import GOLD_DIR
+
+    sources = _resolve_sources(args.source, args.pattern)
+    extracted, loaded = _load_backfill_state(args.state_file)
+    signatures = {path: _file_signature(path) for path in sources}
+
+    # Phase 1: extract the workbooks that have no Bronze batch yet, in parallel
+    batch_dirs = {}
+    pending = []
+    for path in sources:
+        batch_dir = extracted.get((path, signatures[path]["size"], signatures[path]["mtime"]))
+        if batch_dir and os.path.isdir(batch_dir):
+            batch_dirs[path] = batch_dir
+        else:
+            pending.append(path)
+    print(f"[ {datetime.now()} ]-------- Backfill: {len(sources)} file(s) found, "
+          f"{len(pending)} to extract.")
+
+    def record_extracted(file_path, result):
+        _, batch_dir = result
+        batch_dirs[file_path] = batch_dir
+        _append_state(args.state_file, {**signatures[file_path], "batch_dir": batch_dir})
+
+    tasks = [(path, _extract_file, (path, args.bronze_dir)) for path in pending]
+    _, failed = _run_in_pool(tasks, args.workers, record_extracted) if tasks else ([], [])
+
+    # Phase 2: load the batches into the Silver layer, one worker per table, in file order
+    sources_by_table = {}
+    for path in sources:
+        if path in batch_dirs:
+            _batch_sources(batch_dirs[path], path, sources_by_table, skip=loaded)
+    print(f"[ {datetime.now()} ]-------- Backfill: loading {sum(map(len, sources_by_table.values()))} "
+          f"Bronze file(s) across {len(sources_by_table)} table(s).")
+
+    table_results = []
+
+    def record_loaded(_, result):
+        for path in result["loaded"]:
+            _append_state(args.state_file, {"loaded": path})
+        table_results.append(result)
+
+    _, load_failed = _run_in_pool(
+        _table_tasks(sources_by_table, None, None, _pipeline_options(args), GOLD_DIR), args.workers, record_loaded
+    )
+    _refresh_gold(table_results, GOLD_DIR)
+    failed += load_failed
+    if failed:
+        print(f"[ {datetime.now()} ]-------- Backfill finished with {len(failed)} failure(s); "
+              f"run the same command again to retry them.")
+        sys.exit(1)
+
+
+def cmd_replay_bronze(args):
+    from ..pipeline_scripts.bronze_compaction_view import COMPACTED_BRONZE_DIR, read_source_batches
+    from ..pipeline_scripts.gold_store_view import GOLD_DIR
+
+    # Replayed rows are already in the Silver tables and in the delta index: they are merged
+    # by business key, as appending would duplicate them, and bypass the delta detection,
+    # which would drop them all as unchanged
+    if args.load_mode == "append":
+        raise SystemExit("replay-bronze re-applies loaded batches and only supports --load-mode merge.")
+    options = {**_pipeline_options(args), "load_mode": "merge", "delta_index_dir": None}
+
+    # Collect (first batch, kind, path) per table so every table is replayed oldest first
+    ordered = {}
+    for batch_name in sorted(os.listdir(args.bronze_dir)):
+        batch_dir = os.path.join(args.bronze_dir, batch_name)
+        if not os.path.isdir(batch_dir):
+            continue
+        if (args.since and batch_name < args.since) or (args.until and batch_name > args.until):
+            continue
+        batch_sources = {}
+        _batch_sources(batch_dir, batch_dir, batch_sources)
+        for table_name, table_sources in batch_sources.items():
+            ordered.setdefault(table_name, []).extend((batch_name, source) for source in table_sources)
+
+    compacted_dir = args.compacted_dir or COMPACTED_BRONZE_DIR
+    if compacted_dir and os.path.isdir(compacted_dir):
+        for file_path in sorted(glob.glob(os.path.join(compacted_dir, "*", "*.parquet"))):
+            batches = [
+                batch for batch in read_source_batches(file_path)
+                if (not args.since or batch >= args.since) and (not args.until or batch <= args.until)
+            ]
+            if batches:
+                table_name = os.path.basename(os.path.dirname(file_path))
+                ordered.setdefault(table_name, []).append(
+                    (batches[0], ("compacted", file_path, args.bronze_dir))
+                )
+
+    sources_by_table = {
+        table_name: [source for _, source in sorted(entries, key=lambda entry: entry[0])]
+        for table_name, entries in ordered.items()
+    }
+    print(f"[ {datetime.now()} ]-------- Replay: {sum(map(len, sources_by_table.values()))} Bronze file(s) "
+          f"across {len(sources_by_table)} table(s).")
+    # Results are collected as they complete, including those of tables stopped by an error
+    table_results = []
+    _, failed = _run_in_pool(
+        _table_tasks(sources_by_table, args.since, args.until, options, GOLD_DIR), args.workers,
+        lambda _, result: table_results.append(result)
+    )
+    _refresh_gold(table_results, GOLD_DIR)
+    if failed:
+        sys.exit(1)
+
+
+def cmd_compact(args):
+    from ..pipeline_scripts.bronze_compaction_view import COMPACTED_BRONZE_DIR, apply_retention, compact_bronze
+
+    compacted_dir = args.compacted_dir or COMPACTED_BRONZE_DIR
+    if not compacted_dir:
+        raise SystemExit("A compacted Bronze directory is required (--compacted-dir or COMPACTED_BRONZE_DIR).")
+
+    # Only the Bronze files recorded as loaded into the Silver layer are compacted
+    compact_bronze(args.bronze_dir, compacted_dir, args.up_to)
+
+    retention = {}
+    if args.retention_days is not None:
+        retention["max_age_days"] = args.retention_days
+    if args.retention_max_gb is not None:
+        retention["max_total_gb"] = args.retention_max_gb
+    apply_retention(compacted_dir, **retention)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src", description="Hybrid data pipeline command line.")
+    parser.add_argument("--bronze-dir", default=os.getenv('BRONZE_DIR'), help="Bronze directory (default: $BRONZE_DIR).")
+    parser.add_argument("--connection-string", default=None, help="SQLAlchemy connection string of the Silver database.")
+    parser.add_argument("--load-mode", choices=["append", "merge"], default=None, help="Silver load mode (default: $LOAD_MODE or append).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    watch = subparsers.add_parser("watch", help="Watch the raw store and process new files.")
+    watch.add_argument("--path", default=None, help="Directory to watch (default: $RAW_STORE_DIR).")
+    watch.set_defaults(func=cmd_watch)
+
+    ingest = subparsers.add_parser("ingest", help="Process a single file.")
+    ingest.add_argument("file", help="File to ingest.")
+    ingest.set_defaults(func=cmd_ingest)
+
+    backfill = subparsers.add_parser("backfill", help="Process historical files on a process pool.")
+    backfill.add_argument("source", help="Directory or glob pattern of the files to backfill.")
+    backfill.add_argument("--pattern", default="*", help="File pattern when SOURCE is a directory (default: all files).")
+    backfill.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes.")
+    backfill.add_argument("--state-file", default=BACKFILL_STATE_FILE, help="File recording finished files for resuming.")
+    backfill.set_defaults(func=cmd_backfill)
+
+    replay = subparsers.add_parser("replay-bronze", help="Merge stored Bronze batches into the Silver layer again.")
+    replay.add_argument("--since", default=None, help="First batch to replay (YYYYMMDD_HHMMSS).")
+    replay.add_argument("--until", default=None, help="Last batch to replay (YYYYMMDD_HHMMSS).")
+    replay.add_argument("--compacted-dir", default=None, help="Compacted Bronze directory (default: $COMPACTED_BRONZE_DIR).")
+    replay.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes.")
+    replay.set_defaults(func=cmd_replay_bronze)
+
+    compact = subparsers.add_parser("compact", help="Compact processed Bronze batches and apply retention.")
+    compact.add_argument("--compacted-dir", default=None, help="Compacted Bronze directory (default: $COMPACTED_BRONZE_DIR).")
+    compact.add_argument("--up-to", default=None, help="Last batch to compact (default: every batch).")
+    compact.add_argument("--retention-days", type=float, default=None, help="Delete compacted files older than this.")
+    compact.add_argument("--retention-max-gb", type=float, default=None, help="Keep compacted files within this size.")
+    compact.set_defaults(func=cmd_compact)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,92 @@
 from datetime import datetime
+from functools import partial
 import time
 import os
 
 from watchdog.observers import Observer
 from watchdog.events import PatternMatchingEventHandler
 from ..pipeline_scripts.bronze_store_view import extract_and_store_bronze
-from ..pipeline_scripts.silver_store_view import transform_bronze_to_silver_with_metadata
+from ..pipeline_scripts.gold_store_view import refresh_gold_tables
+from ..pipeline_scripts.silver_store_view import (process_bronze_batch, process_bronze_file,
+                                                  transform_bronze_to_silver_with_metadata)
+from ..utils.work_claim_view import (CLAIM_CONNECTION_STRING, claimed, claims_enabled_since, default_worker_id,
+                                     ensure_claims_table, get_claim_detail, list_claimed_keys,
+                                     list_reclaimable_keys, set_claim_detail)
 
 BRONZE_DIR = os.getenv('BRONZE_DIR')
+# Raw data store watched for new batches of data
+RAW_STORE_DIR = os.getenv('RAW_STORE_DIR', "/RAKEZ_BI_Works/datastore/raw_store")
+# Seconds between sweeps for unclaimed files and expired claims when work claiming is enabled
+CLAIM_SWEEP_SECONDS = int(os.getenv('CLAIM_SWEEP_SECONDS', '60'))
 
-if __name__ == "__main__":
-    patterns = ["*"]
-    ignore_patterns = None
-    ignore_directories = False
-    case_sensitive = True
-    my_event_handler = PatternMatchingEventHandler(
-    patterns=["*"], 
-    ignore_patterns=None, 
-    ignore_directories=False, 
-    case_sensitive=True
-)
 
+def raw_work_key(file_path, raw_store_dir=RAW_STORE_DIR):
+    """
+    Claim key of a raw file, identical on every host sharing the raw store.
+
+    The size and modification time are part of the key so a re-sent file is processed again.
+    """
+    stat = os.stat(file_path)
+    relative_path = os.path.relpath(file_path, raw_store_dir).replace(os.sep, "/")
+    return f"raw:{relative_path}:{stat.st_size}:{int(stat.st_mtime)}"
+
+
+def process_raw_file_claimed(file_path, bronze_dir=BRONZE_DIR, raw_store_dir=RAW_STORE_DIR):
+    """
+    Run a raw file through the Bronze and Silver stages if this worker wins its claim.
+
+    A reclaimed file reuses the Bronze batch written by the previous attempt, and the
+    Bronze files already loaded by that attempt are skipped through their own claims.
+
+    Args:
+        file_path (str): Path of the new batch of data.
+        bronze_dir (str): Directory of the Bronze layer.
+        raw_store_dir (str): Root of the raw data store.
+    """
+    work_key = raw_work_key(file_path, raw_store_dir)
+    with claimed(work_key, "raw") as claim:
+        if not claim:
+            print(f"[ {datetime.now()} ]-------- Skipping {file_path}: claimed by another worker.")
+            return
+
+        batch_dir = get_claim_detail(work_key)
+        if not batch_dir or not os.path.isdir(batch_dir):
+            batch_dir = extract_and_store_bronze(file_path, bronze_dir)
+            if batch_dir is None:
+                raise RuntimeError(f"Extraction of '{file_path}' failed")
+            set_claim_detail(work_key, batch_dir)
+
+        # The Bronze files carry their own claims; stop here if this one was already lost
+        claim.ensure_held()
+        folded_tables, failed_files = process_bronze_batch(batch_dir, file_path)
+        if folded_tables:
+            refresh_gold_tables()
+        if failed_files:
+            raise RuntimeError(f"Loading failed for {', '.join(failed_files)} of batch '{batch_dir}'")
+
+
+def process_raw_file(file_path, bronze_dir=BRONZE_DIR, raw_store_dir=RAW_STORE_DIR):
+    """
+    Run a new raw file through the Bronze and Silver stages.
+
+    Args:
+        file_path (str): Path of the new batch of data.
+        bronze_dir (str): Directory of the Bronze layer.
+        raw_store_dir (str): Root of the raw data store.
+    """
+    if CLAIM_CONNECTION_STRING:
+        try:
+            process_raw_file_claimed(file_path, bronze_dir, raw_store_dir)
+        except Exception as exceptmessage:
+            # Exception Message
+            print(f"Data Processing - Failure with {exceptmessage}")
+        return
 
-# trigger event on creation of new file in the directory
-def on_created(event):
-    # User Message
-    print(f"[ {datetime.now()} ]-------- {event.src_path} has been created!")
-    # User Message
-    print('[', datetime.now(), ']--------',
-          "New Batch of Data is Loaded - Event Notification - ", event.src_path)
     # User Message
     print(f'[ {datetime.now()} ]-------- Data Extraction Phase Commenced - Import Data From Raw Data Store - Event Notification ')
     # Call a Data Extaction Function - Argument as File Path of New Batch of Data
     try:
-        extract_and_store_bronze(event.src_path)
+        extract_and_store_bronze(file_path, bronze_dir)
     except Exception as exceptmessage:
         # Exception Message
         print(f"Data Extraction - Failure with {exceptmessage}")
@@ -44,25 +97,105 @@ def on_created(event):
     # Call a Data Extaction Function - Argument as File Path of New Batch of Data
     try:
         print(f"[ {datetime.now()} ]-------- Starting metadata-based transformation and loading to Silver Store...")
-        transform_bronze_to_silver_with_metadata(BRONZE_DIR, event.src_path)
+        transform_bronze_to_silver_with_metadata(bronze_dir, file_path)
     except Exception as exceptmessage:
         # Exception Message
         print(f"Data Extraction - Failure with {exceptmessage}")
 
 
-# Watchdog configuration parameters
-my_event_handler.on_created = on_created
-path = "/RAKEZ_BI_Works/datastore/raw_store"
-go_recursively = True
-my_observer = Observer()
-my_observer.schedule(my_event_handler, path, recursive=go_recursively)
+def sweep_pending_work(raw_store_dir=RAW_STORE_DIR, bronze_dir=BRONZE_DIR):
+    """
+    Pick up work no live worker holds: raw files never claimed (e.g. created while no
+    watcher was running), and raw or Bronze files whose claim expired or failed.
+
+    Only raw files modified since work claiming was enabled are swept, so enabling claims
+    on an existing deployment does not ingest the historical raw store again.
+
+    Args:
+        raw_store_dir (str): Root of the raw data store.
+        bronze_dir (str): Directory of the Bronze layer.
+    """
+    try:
+        claimed_keys = list_claimed_keys("raw")
+        cutoff = claims_enabled_since()
+        for root, _, file_names in os.walk(raw_store_dir):
+            for file_name in file_names:
+                file_path = os.path.join(root, file_name)
+                if datetime.utcfromtimestamp(os.path.getmtime(file_path)) < cutoff:
+                    continue
+                if raw_work_key(file_path, raw_store_dir) not in claimed_keys:
+                    process_raw_file(file_path, bronze_dir, raw_store_dir)
 
-print("******************Data Pipeline Log Messages*********************")
+        for work_key in list_reclaimable_keys("raw"):
+            relative_path = work_key[len("raw:"):].rsplit(":", 2)[0]
+            file_path = os.path.join(raw_store_dir, relative_path)
+            if os.path.exists(file_path) and raw_work_key(file_path, raw_store_dir) == work_key:
+                print(f"[ {datetime.now()} ]-------- Reclaiming {file_path}")
+                process_raw_file(file_path, bronze_dir, raw_store_dir)
 
-my_observer.start()
-try:
-    while True:
-        time.sleep(1)
-except KeyboardInterrupt:
-    my_observer.stop()
-    my_observer.join()
+        for work_key in list_reclaimable_keys("bronze"):
+            file_path = os.path.join(bronze_dir, work_key[len("bronze:"):])
+            if os.path.exists(file_path):
+                print(f"[ {datetime.now()} ]-------- Reclaiming {file_path}")
+                try:
+                    if process_bronze_file(file_path, get_claim_detail(work_key) or file_path):
+                        refresh_gold_tables()
+                except Exception as exceptmessage:
+                    print(f"Data Processing - Failure with {exceptmessage}")
+    except Exception as exceptmessage:
+        print(f"[ {datetime.now()} ]-------- Sweep of pending work failed with {exceptmessage}")
+
+
+# trigger event on creation of new file in the directory
+def on_created(event, bronze_dir=BRONZE_DIR, raw_store_dir=RAW_STORE_DIR):
+    # User Message
+    print(f"[ {datetime.now()} ]-------- {event.src_path} has been created!")
+    # User Message
+    print('[', datetime.now(), ']--------',
+          "New Batch of Data is Loaded - Event Notification - ", event.src_path)
+    process_raw_file(event.src_path, bronze_dir, raw_store_dir)
+
+
+def start_watcher(path=RAW_STORE_DIR, bronze_dir=BRONZE_DIR, go_recursively=True):
+    """
+    Watch the raw data store and process every new file until interrupted.
+
+    Args:
+        path (str): Directory to watch.
+        bronze_dir (str): Directory of the Bronze layer.
+        go_recursively (bool): Whether to watch subdirectories too.
+    """
+    my_event_handler = PatternMatchingEventHandler(
+        patterns=["*"],
+        ignore_patterns=None,
+        ignore_directories=False,
+        case_sensitive=True
+    )
+
+    # Watchdog configuration parameters
+    my_event_handler.on_created = partial(on_created, bronze_dir=bronze_dir, raw_store_dir=path)
+    my_observer = Observer()
+    my_observer.schedule(my_event_handler, path, recursive=go_recursively)
+
+    print("******************Data Pipeline Log Messages*********************")
+
+    my_observer.start()
+    if CLAIM_CONNECTION_STRING:
+        # Several watchers may share the raw store; claims decide which one processes each file
+        ensure_claims_table()
+        print(f"[ {datetime.now()} ]-------- Work claiming enabled for worker {default_worker_id()}, "
+              f"sweeping raw files since {claims_enabled_since()} UTC")
+    last_sweep = 0
+    try:
+        while True:
+            if CLAIM_CONNECTION_STRING and time.time() - last_sweep >= CLAIM_SWEEP_SECONDS:
+                sweep_pending_work(path, bronze_dir)
+                last_sweep = time.time()
+            time.sleep(1)
+    except KeyboardInterrupt:
+        my_observer.stop()
+        my_observer.join()
+
+
+if __name__ == "__main__":
+    start_watcher()
@@ -21,8 +21,13 @@ BRONZE_DIR = os.getenv('BRONZE_DIR')
 # Mapping Pandas types to SQL Server types
 PANDAS_TO_SQL_TYPE_MAPPING = {
     'object': 'NVARCHAR(MAX)',
+    'int8': 'BIGINT',
+    'int16': 'BIGINT',
+    'int32': 'BIGINT',
     'int64': 'BIGINT',
+    'float32': 'FLOAT',
     'float64': 'FLOAT',
+    'category': 'NVARCHAR(MAX)',
     'datetime64[ns]': 'DATETIME',
     'bool': 'BIT',
 }
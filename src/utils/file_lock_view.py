@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Seconds after which a lock left behind by a crashed process is broken
+FILE_LOCK_STALE_SECONDS = int(os.getenv('FILE_LOCK_STALE_SECONDS', '60'))
+
+
+def _read_token(lock_path):
+    try:
+        with open(lock_path) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _keep_alive(lock_path, token, interval, released):
+    # Refresh the lock's modification time while it is held, so it is never taken as stale
+    while not released.wait(interval):
+        if _read_token(lock_path) != token:
+            return
+        try:
+            os.utime(lock_path)
+        except FileNotFoundError:
+            return
+
+
+@contextmanager
+def file_lock(lock_path, stale_seconds=FILE_LOCK_STALE_SECONDS, keep_alive=False):
+    """
+    Serialize a read-modify-write of a shared file across processes and hosts with a lock file.
+
+    The lock file is created atomically with O_EXCL, which also holds on shared file systems.
+    It holds a token unique to its holder, so a holder whose lock was broken as stale never
+    removes the lock of the next holder.
+
+    Args:
+        lock_path (str): Path of the lock file.
+        stale_seconds (int): Age after which an existing lock file is considered abandoned.
+        keep_alive (bool): Refresh the lock from a background thread while it is held, for work
+            that may outlast `stale_seconds`; the lock still goes stale if the holder dies.
+    """
+    token = uuid.uuid4().hex
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > stale_seconds:
+                    # Move the stale lock aside atomically so only one waiter breaks it
+                    stale_path = f"{lock_path}.{token}.stale"
+                    os.rename(lock_path, stale_path)
+                    os.remove(stale_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(0.05)
+    try:
+        os.write(fd, token.encode())
+    finally:
+        os.close(fd)
+    released = threading.Event()
+    if keep_alive:
+        threading.Thread(target=_keep_alive, args=(lock_path, token, stale_seconds / 4, released),
+                         daemon=True).start()
+    try:
+        yield
+    finally:
+        released.set()
+        if _read_token(lock_path) == token:
+            os.remove(lock_path)
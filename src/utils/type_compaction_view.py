@@ -0,0 +1,94 @@
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from .validation_models import CATEGORICAL_DOMAINS
+
+# String columns without a known domain become categorical when distinct values / rows is at most this
+TYPE_COMPACTION_MAX_RATIO = float(os.getenv('TYPE_COMPACTION_MAX_RATIO', '0.5'))
+
+
+def _domain_key(col):
+    return (str(col).replace(" ", "_")
+                    .replace("(", "")
+                    .replace(")", "")
+                    .replace("%", "percent").lower())
+
+
+def _is_low_cardinality(distinct, rows, max_ratio):
+    return rows > 0 and distinct <= max(1, rows * max_ratio)
+
+
+def compact_frame_types(df, max_ratio=TYPE_COMPACTION_MAX_RATIO):
+    """
+    Store low-cardinality string columns as categoricals and downcast numeric columns.
+
+    Columns with a known domain in `CATEGORICAL_DOMAINS` always become categoricals whose
+    categories are the domain plus any other observed values, so invalid values survive
+    until validation. Other string columns become categoricals when their observed
+    cardinality is low. Integers are downcast to the smallest type holding their range;
+    floats are downcast to float32 only when no value changes.
+
+    Args:
+        df (pd.DataFrame): DataFrame to compact.
+        max_ratio (float): Maximum distinct values / rows for a string column without a domain.
+
+    Returns:
+        pd.DataFrame: Compacted copy of the DataFrame.
+    """
+    df = df.copy()
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(series):
+            continue
+
+        if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            # Mixed-type columns are left to validation as they are
+            if pd.api.types.infer_dtype(series, skipna=True) != "string":
+                continue
+            domain = CATEGORICAL_DOMAINS.get(_domain_key(col))
+            if domain is not None:
+                unknown = set(series.dropna().unique()) - set(domain)
+                df[col] = series.astype(pd.CategoricalDtype(sorted(domain) + sorted(unknown)))
+            elif _is_low_cardinality(series.nunique(dropna=True), len(series), max_ratio):
+                df[col] = series.astype("category")
+
+        elif pd.api.types.is_integer_dtype(series):
+            df[col] = pd.to_numeric(series, downcast="integer")
+
+        elif pd.api.types.is_float_dtype(series) and series.dtype != np.float32:
+            downcast = series.astype(np.float32)
+            if np.array_equal(downcast.astype(series.dtype).to_numpy(), series.to_numpy(), equal_nan=True):
+                df[col] = downcast
+    return df
+
+
+def compact_arrow_table(table, max_ratio=TYPE_COMPACTION_MAX_RATIO):
+    """
+    Dictionary-encode low-cardinality string columns of an Arrow table and downcast its integers.
+
+    Uses the same rules as `compact_frame_types` without converting the table to pandas.
+
+    Args:
+        table (pa.Table): Arrow table to compact.
+        max_ratio (float): Maximum distinct values / rows for a string column without a domain.
+
+    Returns:
+        pa.Table: Compacted table.
+    """
+    columns = []
+    for name, column in zip(table.column_names, table.columns):
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            if (_domain_key(name) in CATEGORICAL_DOMAINS
+                    or _is_low_cardinality(pc.count_distinct(column).as_py(), len(column), max_ratio)):
+                column = column.dictionary_encode()
+        elif pa.types.is_integer(column.type) and column.null_count < len(column):
+            bounds = pc.min_max(column).as_py()
+            for candidate in (pa.int8(), pa.int16(), pa.int32()):
+                info = np.iinfo(candidate.to_pandas_dtype())
+                if info.min <= bounds["min"] and bounds["max"] <= info.max:
+                    column = column.cast(candidate)
+                    break
+        columns.append(column)
+    return pa.Table.from_arrays(columns, names=table.column_names)
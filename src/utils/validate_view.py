@@ -2,6 +2,7 @@ from datetime import datetime
 import os
 import pandas as pd
 from pydantic import ValidationError
+from .type_compaction_view import compact_frame_types
 
 
 def split_and_handle_invalid_rows_generic(df, model, table_name, batch_dir):
@@ -14,10 +15,12 @@ def split_and_handle_invalid_rows_generic(df, model, table_name, batch_dir):
         batch_dir (str): Path to the batch directory where valid data is stored.
 
     Returns:
-        pd.DataFrame: Valid rows for database insertion.
+        pd.DataFrame: Valid rows for database insertion, with compacted column types and
+        the index of their rows in `df`.
     """
     try:
         valid_rows = []
+        valid_index = []
         invalid_rows = []
         
         # Sanitize column names
@@ -30,16 +33,18 @@ def split_and_handle_invalid_rows_generic(df, model, table_name, batch_dir):
                         }
         df = df.rename(columns=sanitized_columns)
 
-        for _, row in df.iterrows():
+        for index, row in df.iterrows():
             try:
                 valid_rows.append(model(**row.to_dict()).dict())
+                valid_index.append(index)
             except ValidationError as e:
                 invalid_row = row.to_dict()
                 invalid_row["errors"] = str(e)
                 invalid_rows.append(invalid_row)
 
-        valid_df = pd.DataFrame(valid_rows)
-        invalid_df = pd.DataFrame(invalid_rows)
+        # Rebuild the low-cardinality and numeric columns in their compact form
+        valid_df = compact_frame_types(pd.DataFrame(valid_rows, index=valid_index))
+        invalid_df = compact_frame_types(pd.DataFrame(invalid_rows))
 
         if not invalid_df.empty:
             invalids_dir = os.path.join(batch_dir, "invalids")
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, field_validator, ValidationInfo
 from datetime import datetime
-from typing import Optional
+from typing import ClassVar, Optional
 import re
 
 # Predefined lists for validation
@@ -12,10 +12,24 @@ VALID_GENDERS = {"Male", "Female"}
 VALID_CHANNELS = {"Retail", "Wholesale", "Online"}
 VALID_GEO_LOCATIONS = {"Urban", "Rural", "Suburban"}
 
+# Known value domains of low-cardinality columns, used to store them as categoricals
+CATEGORICAL_DOMAINS = {
+    "region": VALID_REGIONS,
+    "interaction_type": VALID_INTERACTION_TYPES,
+    "category": VALID_CATEGORIES,
+    "outcome": VALID_OUTCOMES,
+    "gender": VALID_GENDERS,
+    "channel": VALID_CHANNELS,
+    "geo_location": VALID_GEO_LOCATIONS,
+}
+
 # -----------------------------------------------
 # Define Pydantic Models for Validation
 # -----------------------------------------------
 class SalesData(BaseModel):
+    # Business keys used by the merge load mode
+    business_keys: ClassVar[tuple] = ("order_id",)
+
     order_id: int
     date: datetime
     region: str
@@ -82,6 +96,9 @@ class SalesData(BaseModel):
 
 
 class CustomerInteraction(BaseModel):
+    # Business keys used by the merge load mode
+    business_keys: ClassVar[tuple] = ("customer_id", "date", "interaction_type", "sales_representative")
+
     customer_id: str
     interaction_type: str
     date: datetime
@@ -138,6 +155,9 @@ class CustomerInteraction(BaseModel):
 
 
 class ProductInventory(BaseModel):
+    # Business keys used by the merge load mode
+    business_keys: ClassVar[tuple] = ("product_id",)
+
     product_id: str
     product_name: str
     category: str
@@ -162,6 +182,9 @@ class ProductInventory(BaseModel):
 
 
 class MarketingCampaign(BaseModel):
+    # Business keys used by the merge load mode
+    business_keys: ClassVar[tuple] = ("campaign_id",)
+
     campaign_id: str
     start_date: datetime
     end_date: datetime
@@ -221,6 +244,9 @@ class MarketingCampaign(BaseModel):
 
 
 class RegionalSalesTarget(BaseModel):
+    # Business keys used by the merge load mode
+    business_keys: ClassVar[tuple] = ("region",)
+
     region: str
     quarter_1_target: float = Field(..., ge=0.0)
     quarter_2_target: float = Field(..., ge=0.0)
@@ -268,4 +294,11 @@ def get_pydantic_model_for_table(table_name):
     elif table_name == "regional_sales_targets":
         return RegionalSalesTarget
     else:
-        raise ValueError(f"No Pydantic model defined for table: {table_name}")
\ No newline at end of file
+        raise ValueError(f"No Pydantic model defined for table: {table_name}")
+
+
+def get_business_keys_for_table(table_name):
+    """
+    Return the business key columns of the Pydantic model for a given table name.
+    """
+    return list(get_pydantic_model_for_table(table_name).business_keys)
@@ -0,0 +1,344 @@
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import DateTime, create_engine, text
+from sqlalchemy.exc import IntegrityError
+
+# Database holding the work claims shared by all workers (e.g. sqlite:////shared/work_claims.db);
+# work claiming is disabled when not set
+CLAIM_CONNECTION_STRING = os.getenv('CLAIM_CONNECTION_STRING')
+# Seconds a claim stays valid without a heartbeat before another worker may reclaim it
+CLAIM_LEASE_SECONDS = int(os.getenv('CLAIM_LEASE_SECONDS', '300'))
+# Number of attempts before failed work is no longer reclaimed
+CLAIM_MAX_ATTEMPTS = int(os.getenv('CLAIM_MAX_ATTEMPTS', '3'))
+
+
+def default_worker_id():
+    """
+    Identify the current worker process; override with the WORKER_ID environment variable.
+    """
+    return os.getenv('WORKER_ID') or f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _utcnow():
+    # Leases are compared across hosts, so all timestamps are UTC
+    return datetime.utcnow()
+
+
+def ensure_claims_table(connection_string=CLAIM_CONNECTION_STRING):
+    """
+    Create the WorkClaims table if it does not exist.
+
+    Args:
+        connection_string (str): SQLAlchemy connection string of the claims database.
+    """
+    try:
+        engine = create_engine(connection_string)
+        with engine.connect() as conn:
+            if conn.dialect.name == "mssql":
+                conn.execute(text("""
+                    IF OBJECT_ID(N'dbo.WorkClaims', N'U') IS NULL
+                    CREATE TABLE WorkClaims (
+                        work_key NVARCHAR(450) PRIMARY KEY,
+                        work_kind NVARCHAR(50),
+                        owner NVARCHAR(200),
+                        status NVARCHAR(20),
+                        attempts INT,
+                        detail NVARCHAR(MAX),
+                        claimed_at DATETIME,
+                        heartbeat_at DATETIME,
+                        lease_expires_at DATETIME,
+                        finished_at DATETIME
+                    );
+                """))
+            else:
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS WorkClaims (
+                        work_key VARCHAR(450) PRIMARY KEY,
+                        work_kind VARCHAR(50),
+                        owner VARCHAR(200),
+                        status VARCHAR(20),
+                        attempts INTEGER,
+                        detail TEXT,
+                        claimed_at DATETIME,
+                        heartbeat_at DATETIME,
+                        lease_expires_at DATETIME,
+                        finished_at DATETIME
+                    );
+                """))
+            conn.commit()
+    except Exception as e:
+        print(f"[ {datetime.now()} ]-------- Error creating work claims table: {e}")
+        raise
+
+
+def claims_enabled_since(connection_string=CLAIM_CONNECTION_STRING):
+    """
+    Return when work claiming was first enabled on the claims database (UTC).
+
+    The first worker to ask records the time in a 'cutoff' row; later workers read it back.
+    Raw files older than this predate the claims and were handled before, so sweeps skip them.
+    """
+    try:
+        engine = create_engine(connection_string)
+        with engine.connect() as conn:
+            try:
+                conn.execute(text("""
+                    INSERT INTO WorkClaims (work_key, work_kind, status, attempts, claimed_at, finished_at)
+                    VALUES ('cutoff:claims_enabled', 'cutoff', 'done', 0, :now, :now);
+                """), {"now": _utcnow()})
+                conn.commit()
+            except IntegrityError:
+                conn.rollback()
+            return conn.execute(
+                text("SELECT claimed_at FROM WorkClaims WHERE work_key = 'cutoff:claims_enabled';")
+                .columns(claimed_at=DateTime)
+            ).scalar()
+    except Exception as e:
+        print(f"[ {datetime.now()} ]-------- Error reading the claims cutoff: {e}")
+        raise
+
+
+def claim_work(work_key, work_kind, owner=None, lease_seconds=CLAIM_LEASE_SECONDS,
+               connection_string=CLAIM_CONNECTION_STRING, max_attempts=CLAIM_MAX_ATTEMPTS):
+    """
+    Try to claim a unit of work for this worker.
+
+    A new key is claimed with an INSERT, which only one worker can win. An existing key can
+    only be reclaimed when its lease expired without being completed, or when it failed
+    fewer than `max_attempts` times. Completed work is never claimed again.
+
+    Args:
+        work_key (str): Unique key of the unit of work.
+        work_kind (str): Kind of work (e.g. 'raw', 'bronze').
+        owner (str): Worker claiming the work; defaults to this process.
+        lease_seconds (int): Lease duration.
+        connection_string (str): SQLAlchemy connection string of the claims database.
+        max_attempts (int): Maximum number of attempts for failed or abandoned work.
+
+    Returns:
+        bool: True if this worker now holds the claim.
+    """
+    owner = owner or default_worker_id()
+    now = _utcnow()
+    params = {
+        "work_key": work_key,
+        "work_kind": work_kind,
+        "owner": owner,
+        "now": now,
+        "lease_expires_at": now + timedelta(seconds=lease_seconds),
+        "max_attempts": max_attempts,
+    }
+    try:
+        engine = create_engine(connection_string)
+        with engine.connect() as conn:
+            try:
+                conn.execute(text("""
+                    INSERT INTO WorkClaims (work_key, work_kind, owner, status, attempts,
+                                            claimed_at, heartbeat_at, lease_expires_at)
+                    VALUES (:work_key, :work_kind, :owner, 'claimed', 1, :now, :now, :lease_expires_at);
+                """), params)
+                conn.commit()
+                return True
+            except IntegrityError:
+                conn.rollback()
+
+            # Reclaim abandoned or failed work in one conditional UPDATE
+            result = conn.execute(text("""
+                UPDATE WorkClaims
+                SET owner = :owner, status = 'claimed', attempts = attempts + 1,
+                    claimed_at = :now, heartbeat_at = :now, lease_expires_at = :lease_expires_at
+                WHERE work_key = :work_key
+                  AND attempts < :max_attempts
+                  AND ((status = 'claimed' AND lease_expires_at < :now) OR status = 'failed');
+            """), params)
+            conn.commit()
+            return result.rowcount == 1
+    except Exception as e:
+        print(f"[ {datetime.now()} ]-------- Error claiming work '{work_key}': {e}")
+        raise
+
+
+def _update_claim(work_key, owner, set_clause, params, connection_string):
+    engine = create_engine(connection_string)
+    with engine.connect() as conn:
+        result = conn.execute(text(f"""
+            UPDATE WorkClaims
+            SET {set_clause}
+            WHERE work_key = :work_key AND owner = :owner AND status = 'claimed';
+        """), {"work_key": work_key, "owner": owner, **params})
+        conn.commit()
+        return result.rowcount == 1
+
+
+def heartbeat(work_key, owner=None, lease_seconds=CLAIM_LEASE_SECONDS, connection_string=CLAIM_CONNECTION_STRING):
+    """
+    Extend the lease of a held claim.
+
+    Returns:
+        bool: False if the claim was lost (e.g. reclaimed after the lease expired).
+    """
+    now = _utcnow()
+    return _update_claim(
+        work_key, owner or default_worker_id(),
+        "heartbeat_at = :now, lease_expires_at = :lease_expires_at",
+        {"now": now, "lease_expires_at": now + timedelta(seconds=lease_seconds)},
+        connection_string,
+    )
+
+
+def set_claim_detail(work_key, detail, owner=None, connection_string=CLAIM_CONNECTION_STRING):
+    """
+    Record progress of a held claim (e.g. the Bronze batch written for a raw file) for a later reclaim.
+    """
+    return _update_claim(work_key, owner or default_worker_id(), "detail = :detail",
+                         {"detail": detail}, connection_string)
+
+
+def complete_work(work_key, owner=None, connection_string=CLAIM_CONNECTION_STRING):
+    """
+    Mark a held claim as done so it is never processed again.
+    """
+    return _update_claim(work_key, owner or default_worker_id(),
+                         "status = 'done', finished_at = :now", {"now": _utcnow()}, connection_string)
+
+
+def fail_work(work_key, owner=None, connection_string=CLAIM_CONNECTION_STRING):
+    """
+    Mark a held claim as failed so another attempt can reclaim it.
+    """
+    return _update_claim(work_key, owner or default_worker_id(),
+                         "status = 'failed', finished_at = :now", {"now": _utcnow()}, connection_string)
+
+
+def get_claim_detail(work_key, connection_string=CLAIM_CONNECTION_STRING):
+    """
+    Return the detail recorded on a claim, or None.
+    """
+    engine = create_engine(connection_string)
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT detail FROM WorkClaims WHERE work_key = :work_key;"),
+                            {"work_key": work_key}).scalar()
+
+
+def list_claimed_keys(work_kind, connection_string=CLAIM_CONNECTION_STRING):
+    """
+    Return all claim keys of a kind, whatever their status.
+    """
+    engine = create_engine(connection_string)
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT work_key FROM WorkClaims WHERE work_kind = :work_kind;"),
+                            {"work_kind": work_kind}).fetchall()
+    return {row[0] for row in rows}
+
+
+def list_reclaimable_keys(work_kind, connection_string=CLAIM_CONNECTION_STRING, max_attempts=CLAIM_MAX_ATTEMPTS):
+    """
+    Return the keys of a kind whose lease expired or that failed and may be attempted again.
+    """
+    engine = create_engine(connection_string)
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT work_key FROM WorkClaims
+            WHERE work_kind = :work_kind
+              AND attempts < :max_attempts
+              AND ((status = 'claimed' AND lease_expires_at < :now) OR status = 'failed');
+        """), {"work_kind": work_kind, "max_attempts": max_attempts, "now": _utcnow()}).fetchall()
+    return [row[0] for row in rows]
+
+
+class LostClaimError(RuntimeError):
+    """
+    Raised when a worker no longer holds the claim on the work it is about to commit.
+    """
+
+
+class Claim:
+    """
+    Outcome of a claim attempt, yielded by `claimed`.
+
+    Truthy when the claim was won. `lost` is set by the heartbeat thread once the lease
+    is known to be lost; `ensure_held` must be called right before committing the work.
+    """
+
+    def __init__(self, work_key, won, owner=None, lease_seconds=CLAIM_LEASE_SECONDS,
+                 connection_string=CLAIM_CONNECTION_STRING):
+        self.work_key = work_key
+        self.won = won
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        self.connection_string = connection_string
+        self.lost = threading.Event()
+
+    def __bool__(self):
+        return self.won
+
+    def ensure_held(self):
+        """
+        Renew the lease and raise LostClaimError if the claim was lost, so another worker
+        that reclaimed the work is the only one to commit it.
+        """
+        if self.lost.is_set() or not heartbeat(self.work_key, self.owner, self.lease_seconds,
+                                                self.connection_string):
+            self.lost.set()
+            raise LostClaimError(f"Claim on '{self.work_key}' was lost; not committing its work")
+
+
+@contextmanager
+def claimed(work_key, work_kind, owner=None, lease_seconds=CLAIM_LEASE_SECONDS,
+            connection_string=CLAIM_CONNECTION_STRING):
+    """
+    Claim a unit of work for the duration of a block, heartbeating in the background.
+
+    Yields a Claim that is truthy if the claim was won; the block should skip the work
+    otherwise, and call `claim.ensure_held()` before committing its results. The claim is
+    completed when the block succeeds and marked failed when it raises.
+
+    Example:
+        with claimed(key, "raw") as claim:
+            if claim:
+                rows = transform(...)
+                claim.ensure_held()
+                load(rows)
+    """
+    owner = owner or default_worker_id()
+    claim = Claim(work_key, False, owner, lease_seconds, connection_string)
+    if not claim_work(work_key, work_kind, owner, lease_seconds, connection_string):
+        yield claim
+        return
+    claim.won = True
+
+    stop = threading.Event()
+
+    def beat():
+        last_renewed = time.monotonic()
+        while not stop.wait(lease_seconds / 3):
+            try:
+                if not heartbeat(work_key, owner, lease_seconds, connection_string):
+                    print(f"[ {datetime.now()} ]-------- Lost claim on '{work_key}'.")
+                    claim.lost.set()
+                    return
+                last_renewed = time.monotonic()
+            except Exception as e:
+                print(f"[ {datetime.now()} ]-------- Heartbeat failed for '{work_key}': {e}")
+                if time.monotonic() - last_renewed >= lease_seconds:
+                    # The lease expired unrenewed; another worker may have reclaimed it
+                    print(f"[ {datetime.now()} ]-------- Lease on '{work_key}' expired.")
+                    claim.lost.set()
+                    return
+
+    beater = threading.Thread(target=beat, daemon=True)
+    beater.start()
+    try:
+        yield claim
+    except BaseException:
+        stop.set()
+        beater.join()
+        fail_work(work_key, owner, connection_string)
+        raise
+    stop.set()
+    beater.join()
+    complete_work(work_key, owner, connection_string)
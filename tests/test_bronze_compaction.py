@@ -0,0 +1,82 @@
+import os
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.pipeline_scripts.bronze_compaction_view import (SOURCE_BATCH_COLUMN, apply_retention, compact_bronze,
+                                                         mark_bronze_file_loaded, read_source_batches)
+
+
+def write_batch_file(bronze_dir, batch_name, file_name, rows, loaded=False):
+    file_path = os.path.join(bronze_dir, batch_name, file_name)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    pd.DataFrame(rows).to_parquet(file_path, index=False)
+    if loaded:
+        mark_bronze_file_loaded(file_path)
+    return file_path
+
+
+def compacted_files(compacted_dir, *parts):
+    directory = os.path.join(compacted_dir, *parts)
+    return sorted(name for name in os.listdir(directory) if name.endswith(".parquet"))
+
+
+def test_only_files_recorded_as_loaded_are_compacted(tmp_path):
+    bronze_dir, compacted_dir = str(tmp_path / "bronze"), str(tmp_path / "compacted")
+    write_batch_file(bronze_dir, "20240101_000000", "sales_data.parquet", {"order_id": [1, 2]}, loaded=True)
+    write_batch_file(bronze_dir, "20240101_000000", os.path.join("invalids", "sales_data_invalids.parquet"),
+                     {"order_id": [3], "errors": ["region"]})
+    # Same batch, still waiting for its load (e.g. a watcher mid-batch or a failed file)
+    pending_sheet = write_batch_file(bronze_dir, "20240101_000000", "product_inventory.parquet",
+                                     {"product_id": ["P1"]})
+    # A later batch loaded while the first was extracted
+    pending_batch = write_batch_file(bronze_dir, "20240102_000000", "sales_data.parquet", {"order_id": [4]})
+
+    compact_bronze(bronze_dir, compacted_dir)
+
+    assert compacted_files(compacted_dir, "sales_data") == ["sales_data-20240101_000000-20240101_000000.parquet"]
+    assert compacted_files(compacted_dir, "sales_data", "invalids") == [
+        "sales_data_invalids-20240101_000000-20240101_000000.parquet"
+    ]
+    assert not os.path.exists(os.path.join(compacted_dir, "product_inventory"))
+    assert os.path.exists(pending_sheet) and os.path.exists(pending_batch)
+    assert not os.path.exists(os.path.join(bronze_dir, "20240101_000000", "sales_data.parquet"))
+    assert not os.path.exists(os.path.join(bronze_dir, "20240101_000000", "invalids"))
+
+
+def test_batches_are_merged_with_their_lineage_and_emptied_directories_removed(tmp_path):
+    bronze_dir, compacted_dir = str(tmp_path / "bronze"), str(tmp_path / "compacted")
+    write_batch_file(bronze_dir, "20240101_000000", "sales_data.parquet", {"order_id": [1, 2]}, loaded=True)
+    compact_bronze(bronze_dir, compacted_dir)
+    write_batch_file(bronze_dir, "20240102_000000", "sales_data.parquet", {"order_id": [3]}, loaded=True)
+    # An empty batch directory is still being extracted
+    os.makedirs(os.path.join(bronze_dir, "20240103_000000"))
+
+    compact_bronze(bronze_dir, compacted_dir)
+
+    [file_name] = compacted_files(compacted_dir, "sales_data")
+    file_path = os.path.join(compacted_dir, "sales_data", file_name)
+    assert file_name == "sales_data-20240101_000000-20240102_000000.parquet"
+    assert read_source_batches(file_path) == ["20240101_000000", "20240102_000000"]
+    compacted = pq.read_table(file_path).to_pandas()
+    assert compacted["order_id"].tolist() == [1, 2, 3]
+    assert compacted[SOURCE_BATCH_COLUMN].astype(str).tolist() == ["20240101_000000"] * 2 + ["20240102_000000"]
+    assert os.listdir(bronze_dir) == ["20240103_000000"]
+
+
+def test_retention_deletes_the_oldest_compacted_files(tmp_path):
+    bronze_dir, compacted_dir = str(tmp_path / "bronze"), str(tmp_path / "compacted")
+    write_batch_file(bronze_dir, "20000101_000000", "sales_data.parquet", {"order_id": [1]}, loaded=True)
+    write_batch_file(bronze_dir, "20000101_000000", os.path.join("invalids", "sales_data_invalids.parquet"),
+                     {"order_id": [2], "errors": ["region"]})
+    compact_bronze(bronze_dir, compacted_dir)
+    recent_batch = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
+    write_batch_file(bronze_dir, recent_batch, "product_inventory.parquet", {"product_id": ["P1"]}, loaded=True)
+    compact_bronze(bronze_dir, compacted_dir)
+
+    report = apply_retention(compacted_dir, max_age_days=30)
+
+    assert report["files_deleted"] == 2
+    assert compacted_files(compacted_dir, "sales_data") == []
+    assert compacted_files(compacted_dir, "sales_data", "invalids") == []
+    assert len(compacted_files(compacted_dir, "product_inventory")) == 1
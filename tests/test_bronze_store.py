@@ -0,0 +1,113 @@
+import gzip
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.pipeline_scripts.bronze_store_view import (extract_and_store_bronze, read_csv_file, read_json_file,
+                                                    sniff_format)
+
+
+def test_extraction_fails_when_a_sheet_cannot_be_saved(tmp_path):
+    bronze_dir = tmp_path / "bronze"
+    bronze_dir.mkdir()
+    file_path = tmp_path / "export.json"
+    # The second table name is not a valid file name, so its Parquet file cannot be written
+    file_path.write_text(json.dumps({"sales_data": [{"order_id": 1}], "missing/dir": [{"order_id": 2}]}))
+
+    assert extract_and_store_bronze(str(file_path), str(bronze_dir)) is None
+    assert os.listdir(bronze_dir) == []
+
+
+SALES_CSV = (
+    "Order ID,Date,Region,Quantity,Sales Amount\n"
+    "1,2024-01-05,North,3,30.5\n"
+    "2,2024-02-10,South,1,12.5\n"
+)
+
+
+def write_file(path, content, compress=False):
+    data = content.encode() if isinstance(content, str) else content
+    with (gzip.open(path, "wb") if compress else open(path, "wb")) as f:
+        f.write(data)
+    return str(path)
+
+
+@pytest.mark.parametrize("file_name, content, compress, expected", [
+    ("sales_data.csv", SALES_CSV, False, ("csv", None)),
+    ("sales_data.jsonl", '{"order_id": 1}\n', False, ("jsonl", None)),
+    ("sales_data.csv.gz", SALES_CSV, True, ("csv", "gzip")),
+    # Unknown extensions are sniffed from the (decompressed) content
+    ("export.dat", '[{"order_id": 1}]', False, ("json", None)),
+    ("export.dat", '  {"order_id": 1}\n', False, ("json", None)),
+    ("export.dat", SALES_CSV, False, ("csv", None)),
+    ("export.dat", b"PK\x03\x04workbook", False, ("excel", None)),
+    ("export.dat", b"\xd0\xcf\x11\xe0workbook", False, ("excel", None)),
+    ("export.dat", '[{"order_id": 1}]', True, ("json", "gzip")),
+])
+def test_format_is_sniffed_from_extension_and_content(tmp_path, file_name, content, compress, expected):
+    assert sniff_format(write_file(tmp_path / file_name, content, compress)) == expected
+
+
+def test_gzip_csv_is_streamed_and_typed_after_the_model(tmp_path):
+    file_path = write_file(tmp_path / "sales_data.csv.gz", SALES_CSV, compress=True)
+
+    table = read_csv_file(file_path, "gzip")["sales_data"]
+
+    assert table.schema.field("Order ID").type == pa.int64()
+    assert table.schema.field("Sales Amount").type == pa.float64()
+    assert table.column("Region").to_pylist() == ["North", "South"]
+
+
+def test_gzip_file_is_extracted_into_a_batch(tmp_path):
+    bronze_dir = tmp_path / "bronze"
+    bronze_dir.mkdir()
+    file_path = write_file(tmp_path / "sales_data.csv.gz", SALES_CSV, compress=True)
+
+    batch_dir = extract_and_store_bronze(file_path, str(bronze_dir))
+
+    stored = pq.read_table(os.path.join(batch_dir, "sales_data.parquet")).to_pandas()
+    assert stored["Order ID"].tolist() == [1, 2]
+
+
+def test_csv_with_unparsable_values_falls_back_to_strings(tmp_path):
+    file_path = write_file(tmp_path / "sales_data.csv", SALES_CSV + "3,2024-03-01,East,three,8.0\n")
+
+    table = read_csv_file(file_path)["sales_data"]
+
+    # Every model column is read as text and left to the row validation
+    for column in ["Order ID", "Date", "Region", "Quantity", "Sales Amount"]:
+        assert table.schema.field(column).type == pa.string()
+    assert table.column("Quantity").to_pylist() == ["3", "1", "three"]
+
+
+def test_json_file_holding_json_lines_is_read_as_json_lines(tmp_path):
+    file_path = write_file(tmp_path / "sales_data.json",
+                           '{"order_id": 1, "region": "North"}\n{"order_id": 2, "region": "South"}\n')
+
+    sheets = read_json_file(file_path)
+
+    assert list(sheets) == ["sales_data"]
+    assert isinstance(sheets["sales_data"], pa.Table)
+    assert sheets["sales_data"].column("order_id").to_pylist() == [1, 2]
+
+
+@pytest.mark.parametrize("document, expected", [
+    # An array of records is one table named after the file
+    ([{"order_id": 1}, {"order_id": 2}], {"export": [1, 2]}),
+    # A single record, pretty-printed over several lines
+    ({"order_id": 1}, {"export": [1]}),
+    # An object of record arrays holds one table per key, even on a single line
+    ({"sales_data": [{"order_id": 1}], "orders": [{"order_id": 2}, {"order_id": 3}]},
+     {"sales_data": [1], "orders": [2, 3]}),
+])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_json_document_is_read_into_tables(tmp_path, document, expected, indent):
+    file_path = write_file(tmp_path / "export.json", json.dumps(document, indent=indent))
+
+    sheets = read_json_file(file_path)
+
+    # A one-line single record is also a valid JSON Lines file and comes back as an Arrow table
+    assert {name: pa.table(sheet)["order_id"].to_pylist() for name, sheet in sheets.items()} == expected
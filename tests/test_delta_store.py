@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from src.pipeline_scripts.delta_store_view import commit_row_hashes, compute_row_hashes, filter_new_or_changed_rows
+
+
+def load_drop(rows, index_dir, include_changed=True):
+    df = pd.DataFrame(rows, columns=["Order ID", "Quantity"])
+    delta, hashes = filter_new_or_changed_rows(df, "sales_data", index_dir, include_changed)
+    commit_row_hashes("sales_data", hashes, index_dir)
+    return delta["Order ID"].tolist()
+
+
+def test_row_corrected_back_to_a_previous_version_is_detected(tmp_path):
+    assert load_drop([(1, 5), (2, 6)], str(tmp_path)) == [1, 2]
+    assert load_drop([(1, 7), (2, 6)], str(tmp_path)) == [1]
+    assert load_drop([(1, 5), (2, 6)], str(tmp_path)) == [1]
+    assert load_drop([(1, 5), (2, 6)], str(tmp_path)) == []
+
+
+def test_changed_rows_are_skipped_for_append_loads(tmp_path):
+    assert load_drop([(1, 5)], str(tmp_path), include_changed=False) == [1]
+    assert load_drop([(1, 7), (2, 6)], str(tmp_path), include_changed=False) == [2]
+    # The skipped correction is still reported to a later merge load
+    assert load_drop([(1, 7), (2, 6)], str(tmp_path)) == [1]
+
+
+@pytest.mark.parametrize("column, dtype", [
+    ("Quantity", "int8"), ("Quantity", "int16"), ("Quantity", "int32"), ("Sales Amount", "float32"),
+])
+def test_compacted_numeric_types_hash_like_full_width_ones(column, dtype):
+    full = pd.DataFrame({"Order ID": [1, 2], "Quantity": [-1, 3], "Sales Amount": [-0.5, 2.25]})
+    compacted = full.astype({column: dtype})
+
+    assert (compute_row_hashes(compacted) == compute_row_hashes(full)).all()
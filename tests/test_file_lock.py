@@ -0,0 +1,49 @@
+import os
+import threading
+import time
+
+from src.utils.file_lock_view import file_lock
+
+
+def test_slow_holder_does_not_release_the_lock_of_the_next_holder(tmp_path):
+    lock_path = str(tmp_path / "partials.parquet.lock")
+    broken = threading.Event()
+    released = threading.Event()
+
+    def slow_holder():
+        with file_lock(lock_path, stale_seconds=0.2):
+            broken.wait(5)
+        released.set()
+
+    holder = threading.Thread(target=slow_holder)
+    holder.start()
+    time.sleep(0.1)
+
+    # The next holder breaks the stale lock and still holds it when the slow holder finishes
+    with file_lock(lock_path, stale_seconds=0.2):
+        broken.set()
+        released.wait(5)
+        assert os.path.exists(lock_path)
+    holder.join()
+
+    assert not os.path.exists(lock_path)
+
+
+def test_kept_alive_lock_is_not_broken_while_held(tmp_path):
+    lock_path = str(tmp_path / "sales_data_key_hashes.npy.load.lock")
+    events = []
+
+    def next_holder():
+        with file_lock(lock_path, stale_seconds=0.2):
+            events.append("next holder")
+
+    with file_lock(lock_path, stale_seconds=0.2, keep_alive=True):
+        waiter = threading.Thread(target=next_holder)
+        waiter.start()
+        # Held for several times the stale age
+        time.sleep(0.8)
+        events.append("released")
+    waiter.join()
+
+    assert events == ["released", "next holder"]
+    assert not os.path.exists(lock_path)
@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+
+from src.pipeline_scripts import gold_store_view
+from src.pipeline_scripts.gold_store_view import (_partials_path, apply_pending_folds, compute_batch_partials,
+                                                  correct_aggregates, fold_batch_into_aggregates, record_pending_fold)
+
+KEYS = ["year", "quarter", "region", "product", "channel"]
+
+
+def sales_frame(rows):
+    df = pd.DataFrame(rows, columns=["order_id", "date", "region", "product", "channel", "quantity", "sales_amount"])
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def normalized(partials):
+    partials = partials.copy()
+    for key in ["region", "product", "channel"]:
+        partials[key] = partials[key].astype(object)
+    return partials.sort_values(KEYS).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("corrections", [
+    # Sum/count only: the replaced value was neither the group's min nor its max
+    [(2, "2024-01-20", "North", "Product A", "Retail", 4, 45.0)],
+    # The replaced value was the group's max
+    [(3, "2024-02-01", "North", "Product A", "Retail", 1, 10.0)],
+    # The row moves to another group, emptying its own
+    [(4, "2024-05-01", "North", "Product A", "Retail", 2, 20.0)],
+])
+def test_correct_aggregates_matches_full_rebuild(tmp_path, corrections):
+    silver = sales_frame([
+        (1, "2024-01-05", "North", "Product A", "Retail", 3, 30.0),
+        (2, "2024-01-20", "North", "Product A", "Retail", 5, 50.0),
+        (3, "2024-02-01", "North", "Product A", "Retail", 9, 90.0),
+        (4, "2024-04-01", "South", "Product B", "Online", 2, 20.0),
+    ])
+    gold_dir = str(tmp_path)
+    fold_batch_into_aggregates(silver, "sales_data", gold_dir)
+
+    new_rows = sales_frame(corrections)
+    old_rows = silver[silver["order_id"].isin(new_rows["order_id"])]
+    silver = pd.concat([silver[~silver["order_id"].isin(new_rows["order_id"])], new_rows], ignore_index=True)
+
+    read_groups = []
+
+    def read_group_rows(groups, date_column):
+        read_groups.append(groups)
+        dates = pd.to_datetime(silver[date_column])
+        rows = silver.assign(year=dates.dt.year, quarter=dates.dt.quarter)
+        return rows.merge(groups, on=list(groups.columns)).drop(columns=["year", "quarter"])
+
+    assert correct_aggregates(old_rows, new_rows, "sales_data", read_group_rows, gold_dir)
+
+    stored = pd.read_parquet(_partials_path("sales_data", gold_dir))
+    pd.testing.assert_frame_equal(normalized(stored), normalized(compute_batch_partials(silver, "sales_data")),
+                                  check_dtype=False)
+    if corrections[0][0] == 2:
+        assert not read_groups
+
+
+def test_failed_fold_is_kept_and_retried(tmp_path, monkeypatch):
+    gold_dir = str(tmp_path)
+    batch = sales_frame([
+        (1, "2024-01-05", "North", "Product A", "Retail", 3, 30.0),
+        (2, "2024-01-20", "North", "Product A", "Retail", 5, 50.0),
+    ])
+    record_pending_fold("sales_data", batch, gold_dir=gold_dir)
+
+    def failing_fold(*args, **kwargs):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(gold_store_view, "fold_batch_into_aggregates", failing_fold)
+        with pytest.raises(OSError):
+            apply_pending_folds("sales_data", None, gold_dir)
+    assert not (tmp_path / "partials").exists()
+
+    assert apply_pending_folds("sales_data", None, gold_dir)
+    assert not apply_pending_folds("sales_data", None, gold_dir)
+    stored = pd.read_parquet(_partials_path("sales_data", gold_dir))
+    assert stored["sales_amount_sum"].tolist() == [80.0]
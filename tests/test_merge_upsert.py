@@ -0,0 +1,105 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.pipeline_scripts.silver_store_view import merge_upsert, read_table_groups
+
+
+@pytest.fixture
+def connection_string(tmp_path):
+    # A file database: merge_upsert opens its own engine, which would not see an in-memory one
+    connection_string = f"sqlite:///{tmp_path / 'silver.db'}"
+    engine = create_engine(connection_string)
+    with engine.connect() as conn:
+        conn.execute(text("""
+            CREATE TABLE sales_data (
+                order_id BIGINT,
+                date DATETIME,
+                region TEXT,
+                quantity BIGINT,
+                sales_amount FLOAT
+            );
+        """))
+        conn.commit()
+    return connection_string
+
+
+def read_rows(connection_string):
+    engine = create_engine(connection_string)
+    with engine.connect() as conn:
+        return {
+            row.order_id: row
+            for row in conn.execute(text("SELECT * FROM sales_data ORDER BY order_id"))
+        }
+
+
+def sales_frame(rows):
+    df = pd.DataFrame(rows, columns=["order_id", "date", "region", "quantity", "sales_amount"])
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def test_merge_upsert_inserts_updates_and_skips_unchanged_rows(connection_string):
+    first = sales_frame([
+        (1, "2024-01-05", "North", 3, 30.0),
+        (2, "2024-02-10", "South", 1, 12.5),
+        (3, "2024-03-15", "East", 2, np.nan),
+    ])
+    inserted, updated, replaced = merge_upsert(first, "sales_data", ["order_id"], connection_string)
+
+    assert list(inserted["order_id"]) == [1, 2, 3]
+    assert updated.empty and replaced.empty
+    rows = read_rows(connection_string)
+    assert rows[3].sales_amount is None
+    assert str(rows[1].date).startswith("2024-01-05")
+
+    second = sales_frame([
+        (1, "2024-01-05", "North", 3, 30.0),   # unchanged
+        (2, "2024-02-10", "South", 4, 50.0),   # corrected
+        (3, "2024-03-15", "East", 2, np.nan),  # unchanged, NULL compared NULL-safe
+        (4, "2024-04-20", "West", 7, 70.0),    # new
+    ])
+    second["region"] = second["region"].astype("category")
+    second["quantity"] = second["quantity"].astype("int8")
+    inserted, updated, replaced = merge_upsert(second, "sales_data", ["order_id"], connection_string)
+
+    assert list(inserted["order_id"]) == [4]
+    assert list(updated["order_id"]) == [2]
+    assert replaced[["order_id", "quantity", "sales_amount"]].values.tolist() == [[2, 1, 12.5]]
+    rows = read_rows(connection_string)
+    assert len(rows) == 4
+    assert (rows[2].quantity, rows[2].sales_amount) == (4, 50.0)
+    assert rows[3].sales_amount is None
+    assert rows[4].region == "West"
+
+
+def test_merge_upsert_sets_missing_values_to_null(connection_string):
+    merge_upsert(sales_frame([(1, "2024-01-05", "North", 3, 30.0)]), "sales_data", ["order_id"], connection_string)
+
+    corrected = sales_frame([(1, None, "North", 3, math.nan)])
+    inserted, updated, replaced = merge_upsert(corrected, "sales_data", ["order_id"], connection_string)
+
+    assert inserted.empty
+    assert len(updated) == 1
+    assert replaced["sales_amount"].tolist() == [30.0]
+    row = read_rows(connection_string)[1]
+    assert row.date is None
+    assert row.sales_amount is None
+
+
+def test_read_table_groups_reads_only_the_requested_groups(connection_string):
+    merge_upsert(sales_frame([
+        (1, "2024-01-05", "North", 3, 30.0),
+        (2, "2024-03-31", "North", 1, 12.5),
+        (3, "2024-04-01", "North", 2, 20.0),
+        (4, "2024-01-10", "South", 7, 70.0),
+        (5, None, None, 1, 10.0),
+    ]), "sales_data", ["order_id"], connection_string)
+
+    groups = pd.DataFrame({"year": [2024, float("nan")], "quarter": [1, float("nan")], "region": ["North", None]})
+    rows = read_table_groups("sales_data", groups, "date", connection_string)
+
+    assert sorted(rows["order_id"]) == [1, 2, 5]
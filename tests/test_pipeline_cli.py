@@ -0,0 +1,114 @@
+import concurrent.futures
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from src.pipeline_scripts import silver_store_view
+from src.pipeline_scripts.bronze_compaction_view import compact_bronze, mark_bronze_file_loaded
+from src.pipeline_scripts.bronze_store_view import extract_and_store_bronze
+from src.triggers.pipeline_cli_view import main
+
+
+@pytest.fixture
+def silver_loads(monkeypatch):
+    """
+    Record the Silver loads instead of running them, with the pool workers run in-process.
+    """
+    loads = []
+
+    def load_bronze_table(df, table_name, batch_dir, parent_file_path, file_name, gold_dir=None, **options):
+        loads.append((table_name, os.path.basename(batch_dir), df.iloc[:, 0].tolist()))
+        return False
+
+    monkeypatch.setattr(silver_store_view, "load_bronze_table", load_bronze_table)
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", ThreadPoolExecutor)
+    return loads
+
+
+def write_raw_file(raw_dir, file_name, order_ids):
+    file_path = os.path.join(raw_dir, file_name)
+    pd.DataFrame({"order_id": order_ids}).to_csv(file_path, index=False)
+    return os.path.abspath(file_path)
+
+
+def write_state(state_file, entries):
+    with open(state_file, "a") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+
+
+def extracted_entry(file_path, batch_dir):
+    stat = os.stat(file_path)
+    return {"file": file_path, "size": stat.st_size, "mtime": stat.st_mtime, "batch_dir": batch_dir}
+
+
+def test_backfill_resumes_from_a_partial_state_file(tmp_path, silver_loads):
+    raw_dir, bronze_dir = tmp_path / "raw", tmp_path / "bronze"
+    raw_dir.mkdir()
+    bronze_dir.mkdir()
+    state_file = str(tmp_path / "state.jsonl")
+    loaded_file = write_raw_file(raw_dir, "orders_a.csv", [1])
+    extracted_file = write_raw_file(raw_dir, "orders_b.csv", [2])
+    write_raw_file(raw_dir, "orders_c.csv", [3])
+
+    # An earlier run extracted and loaded orders_a, extracted orders_b and stopped before orders_c
+    loaded_batch = extract_and_store_bronze(loaded_file, str(bronze_dir))
+    extracted_batch = extract_and_store_bronze(extracted_file, str(bronze_dir))
+    write_state(state_file, [
+        extracted_entry(loaded_file, loaded_batch),
+        extracted_entry(extracted_file, extracted_batch),
+        {"loaded": os.path.join(loaded_batch, "orders_a.parquet")},
+    ])
+
+    main(["--bronze-dir", str(bronze_dir), "backfill", str(raw_dir), "--pattern", "*.csv",
+          "--workers", "1", "--state-file", state_file])
+
+    [new_batch] = set(os.listdir(bronze_dir)) - {os.path.basename(loaded_batch), os.path.basename(extracted_batch)}
+    assert sorted(silver_loads) == [
+        ("orders_b", os.path.basename(extracted_batch), [2]),
+        ("orders_c", new_batch, [3]),
+    ]
+
+    # Everything is recorded now, so running again extracts and loads nothing
+    silver_loads.clear()
+    main(["--bronze-dir", str(bronze_dir), "backfill", str(raw_dir), "--pattern", "*.csv",
+          "--workers", "1", "--state-file", state_file])
+    assert len(os.listdir(bronze_dir)) == 3
+    assert silver_loads == []
+
+
+def test_replay_loads_each_table_oldest_batch_first(tmp_path, silver_loads):
+    bronze_dir, compacted_dir = str(tmp_path / "bronze"), str(tmp_path / "compacted")
+
+    def write_batch_file(batch_name, file_name, order_ids):
+        file_path = os.path.join(bronze_dir, batch_name, file_name)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        pd.DataFrame({"order_id": order_ids}).to_parquet(file_path, index=False)
+        return file_path
+
+    mark_bronze_file_loaded(write_batch_file("20231231_000000", "sales_data.parquet", [1]))
+    compact_bronze(bronze_dir, compacted_dir)
+    write_batch_file("20240102_000000", "sales_data.parquet", [3])
+    write_batch_file("20240101_000000", "sales_data.parquet", [2])
+    write_batch_file("20240101_000000", "product_inventory.parquet", [10])
+
+    main(["--bronze-dir", bronze_dir, "--load-mode", "merge", "replay-bronze",
+          "--compacted-dir", compacted_dir, "--workers", "1"])
+
+    assert [load for load in silver_loads if load[0] == "sales_data"] == [
+        ("sales_data", "20231231_000000", [1]),
+        ("sales_data", "20240101_000000", [2]),
+        ("sales_data", "20240102_000000", [3]),
+    ]
+    assert ("product_inventory", "20240101_000000", [10]) in silver_loads
+
+    silver_loads.clear()
+    main(["--bronze-dir", bronze_dir, "--load-mode", "merge", "replay-bronze",
+          "--compacted-dir", compacted_dir, "--workers", "1", "--since", "20240101_000000"])
+    assert [load[1:] for load in silver_loads if load[0] == "sales_data"] == [
+        ("20240101_000000", [2]),
+        ("20240102_000000", [3]),
+    ]
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.pipeline_scripts import silver_store_view
+from src.pipeline_scripts.silver_store_view import load_bronze_table
+
+COLUMNS = ["Order ID", "Date", "Region", "Sales Representative", "Customer", "Product", "Channel",
+           "Geo Location", "Quantity", "Sales Amount"]
+
+
+@pytest.fixture
+def connection_string(tmp_path, monkeypatch):
+    connection_string = f"sqlite:///{tmp_path / 'silver.db'}"
+    engine = create_engine(connection_string)
+    with engine.connect() as conn:
+        conn.execute(text("""
+            CREATE TABLE DataProcessingMetadata (
+                file_name TEXT, sheet_name TEXT, row_count INTEGER, last_processed_time DATETIME
+            );
+        """))
+        conn.execute(text("""
+            CREATE TABLE sales_data (
+                order_id BIGINT, date DATETIME, region TEXT, sales_representative TEXT, customer TEXT,
+                product TEXT, channel TEXT, geo_location TEXT, quantity BIGINT, sales_amount FLOAT
+            );
+        """))
+        conn.commit()
+    # The table is created above: the existence check queries SQL Server's INFORMATION_SCHEMA
+    monkeypatch.setattr(silver_store_view, "ensure_table_exists", lambda *args, **kwargs: None)
+    return connection_string
+
+
+def sales_drop(rows):
+    return pd.DataFrame([
+        (order_id, date, region, "Rep Alice", "Customer 1", "Product A", "Retail", "Urban", quantity, amount)
+        for order_id, date, region, quantity, amount in rows
+    ], columns=COLUMNS)
+
+
+def read_silver(connection_string):
+    engine = create_engine(connection_string)
+    with engine.connect() as conn:
+        return pd.read_sql(text("SELECT * FROM sales_data ORDER BY order_id"), conn)
+
+
+def test_invalid_row_corrected_in_a_later_drop_is_loaded(tmp_path, connection_string):
+    index_dir = str(tmp_path / "index")
+
+    def load(drop_number, rows):
+        load_bronze_table(sales_drop(rows), "sales_data", str(tmp_path / f"batch_{drop_number}"),
+                          f"drop_{drop_number}.xlsx", "sales_data.parquet", connection_string,
+                          gold_dir=None, load_mode="append", delta_index_dir=index_dir)
+
+    load(1, [(1, "2024-01-05", "North", 3, 30.0), (2, "2024-02-10", "Nowhere", 1, 12.5)])
+    assert read_silver(connection_string)["order_id"].tolist() == [1]
+
+    load(2, [(1, "2024-01-05", "North", 3, 30.0), (2, "2024-02-10", "South", 1, 12.5)])
+    silver = read_silver(connection_string)
+    assert silver["order_id"].tolist() == [1, 2]
+    assert silver["region"].tolist() == ["North", "South"]
+
+    # The corrected row is now recorded as loaded
+    load(3, [(1, "2024-01-05", "North", 3, 30.0), (2, "2024-02-10", "South", 1, 12.5)])
+    assert len(read_silver(connection_string)) == 2
+
+
+def test_two_workers_appending_overlapping_drops_load_each_row_once(tmp_path, connection_string, monkeypatch):
+    index_dir = str(tmp_path / "index")
+    bulk_insert = silver_store_view.bulk_insert
+
+    def slow_bulk_insert(*args, **kwargs):
+        # Leave the other worker time to filter its drop against the index meanwhile
+        time.sleep(0.3)
+        bulk_insert(*args, **kwargs)
+
+    monkeypatch.setattr(silver_store_view, "bulk_insert", slow_bulk_insert)
+    drops = {
+        1: [(1, "2024-01-05", "North", 3, 30.0), (2, "2024-02-10", "South", 1, 12.5)],
+        2: [(1, "2024-01-05", "North", 3, 30.0), (2, "2024-02-10", "South", 1, 12.5),
+            (3, "2024-03-01", "East", 2, 20.0)],
+    }
+    errors = []
+
+    def worker(drop_number):
+        try:
+            load_bronze_table(sales_drop(drops[drop_number]), "sales_data", str(tmp_path / f"batch_{drop_number}"),
+                              f"drop_{drop_number}.xlsx", "sales_data.parquet", connection_string,
+                              gold_dir=None, load_mode="append", delta_index_dir=index_dir)
+        except Exception as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=worker, args=(drop_number,)) for drop_number in drops]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    assert errors == []
+    assert read_silver(connection_string)["order_id"].tolist() == [1, 2, 3]
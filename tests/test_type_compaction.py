@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.utils.type_compaction_view import compact_arrow_table, compact_frame_types
+from src.utils.validation_models import VALID_REGIONS
+
+
+def test_values_outside_the_domain_are_kept_as_extra_categories():
+    df = pd.DataFrame({"Region": ["North", "Nowhere", None, "north"]})
+
+    compacted = compact_frame_types(df)
+
+    # A known domain makes the column categorical however many distinct values it has
+    assert isinstance(compacted["Region"].dtype, pd.CategoricalDtype)
+    assert list(compacted["Region"].cat.categories) == sorted(VALID_REGIONS) + ["Nowhere", "north"]
+    assert compacted["Region"].tolist()[:2] == ["North", "Nowhere"]
+    assert pd.isna(compacted["Region"][2]) and compacted["Region"][3] == "north"
+
+    table = compact_arrow_table(pa.table({"Region": ["North", "Nowhere", None, "north"]}))
+    assert pa.types.is_dictionary(table.schema.field("Region").type)
+    assert table.column("Region").to_pylist() == ["North", "Nowhere", None, "north"]
+
+
+@pytest.mark.parametrize("values, max_ratio, is_categorical", [
+    (["Customer 1", "Customer 2", "Customer 1", "Customer 2"], 0.5, True),
+    (["Customer 1", "Customer 2", "Customer 3", "Customer 1"], 0.5, False),
+    (["Customer 1", "Customer 2", "Customer 3", "Customer 1"], 0.75, True),
+    # A single distinct value is always low-cardinality
+    (["Customer 1"], 0.5, True),
+])
+def test_columns_without_a_domain_follow_the_cardinality_threshold(values, max_ratio, is_categorical):
+    compacted = compact_frame_types(pd.DataFrame({"Customer": values}), max_ratio)
+    table = compact_arrow_table(pa.table({"Customer": values}), max_ratio)
+
+    assert isinstance(compacted["Customer"].dtype, pd.CategoricalDtype) == is_categorical
+    assert compacted["Customer"].tolist() == values
+    assert pa.types.is_dictionary(table.schema.field("Customer").type) == is_categorical
+    assert table.column("Customer").to_pylist() == values
+
+
+def test_mixed_type_columns_are_left_to_validation():
+    df = pd.DataFrame({"Customer": ["Customer 1", 2, "Customer 1", 2]})
+
+    assert compact_frame_types(df)["Customer"].dtype == object
+
+
+@pytest.mark.parametrize("values, expected", [
+    ([0, 127], np.int8),
+    ([-128, 127], np.int8),
+    ([128], np.int16),
+    ([-129, 32767], np.int16),
+    ([32768], np.int32),
+    ([-2 ** 31, 2 ** 31 - 1], np.int32),
+    ([2 ** 31], np.int64),
+    ([-2 ** 31 - 1], np.int64),
+])
+def test_integers_are_downcast_to_the_smallest_type_holding_their_range(values, expected):
+    compacted = compact_frame_types(pd.DataFrame({"Quantity": np.array(values, dtype=np.int64)}))
+    table = compact_arrow_table(pa.table({"Quantity": pa.array(values, pa.int64())}))
+
+    assert compacted["Quantity"].dtype == expected
+    assert compacted["Quantity"].tolist() == values
+    assert table.schema.field("Quantity").type == pa.from_numpy_dtype(expected)
+    assert table.column("Quantity").to_pylist() == values
+
+
+def test_arrow_integer_columns_of_only_nulls_are_kept():
+    table = compact_arrow_table(pa.table({"Quantity": pa.array([None, None], pa.int64())}))
+
+    assert table.schema.field("Quantity").type == pa.int64()
+
+
+@pytest.mark.parametrize("values, expected", [
+    ([1.5, 2.25, np.nan, -4.0], np.float32),
+    ([0.1, 2.5], np.float64),
+    ([16777217.0], np.float64),
+])
+def test_floats_are_downcast_only_when_no_value_changes(values, expected):
+    compacted = compact_frame_types(pd.DataFrame({"Sales Amount": values}))
+
+    assert compacted["Sales Amount"].dtype == expected
+    np.testing.assert_array_equal(compacted["Sales Amount"].astype(np.float64).to_numpy(), values)
+
+
+def test_compacted_columns_round_trip_through_a_dictionary_encoded_parquet_file(tmp_path):
+    df = pd.DataFrame({
+        "Region": ["North", "South", "Nowhere", "North"],
+        "Channel": ["Retail", "Online", "Retail", "Retail"],
+        "Quantity": [3, 1, 2, 5],
+        "Sales Amount": [30.5, 12.25, 8.0, 50.0],
+    })
+    frame_path, table_path = str(tmp_path / "frame.parquet"), str(tmp_path / "table.parquet")
+
+    compact_frame_types(df).to_parquet(frame_path, index=False)
+    pq.write_table(compact_arrow_table(pa.Table.from_pandas(df, preserve_index=False)), table_path)
+
+    for path in (frame_path, table_path):
+        stored = pq.read_table(path)
+        assert pa.types.is_dictionary(stored.schema.field("Region").type)
+        assert pa.types.is_dictionary(stored.schema.field("Channel").type)
+        assert stored.schema.field("Quantity").type == pa.int8()
+        # Every column chunk of the compacted columns is written with dictionary encoding
+        row_group = pq.ParquetFile(path).metadata.row_group(0)
+        for i in range(row_group.num_columns):
+            if row_group.column(i).path_in_schema in ("Region", "Channel"):
+                assert row_group.column(i).has_dictionary_page
+        read_back = stored.to_pandas()
+        assert isinstance(read_back["Region"].dtype, pd.CategoricalDtype)
+        pd.testing.assert_frame_equal(read_back.astype({"Region": object, "Channel": object}),
+                                      df, check_dtype=False)
+    assert pq.read_table(frame_path).schema.field("Sales Amount").type == pa.float32()
@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.utils.work_claim_view import (LostClaimError, claim_work, claimed, claims_enabled_since, ensure_claims_table,
+                                      list_claimed_keys)
+
+
+@pytest.fixture
+def connection_string(tmp_path):
+    connection_string = f"sqlite:///{tmp_path / 'claims.db'}"
+    ensure_claims_table(connection_string)
+    return connection_string
+
+
+def expire_lease(work_key, connection_string):
+    engine = create_engine(connection_string)
+    with engine.connect() as conn:
+        conn.execute(text("UPDATE WorkClaims SET lease_expires_at = '2000-01-01' WHERE work_key = :work_key"),
+                     {"work_key": work_key})
+        conn.commit()
+
+
+def test_claim_reclaimed_by_another_worker_cannot_commit(connection_string):
+    with pytest.raises(LostClaimError):
+        with claimed("bronze:batch/sales_data.parquet", "bronze", owner="worker-a",
+                     connection_string=connection_string) as claim:
+            assert claim
+            claim.ensure_held()
+
+            expire_lease("bronze:batch/sales_data.parquet", connection_string)
+            assert claim_work("bronze:batch/sales_data.parquet", "bronze", owner="worker-b",
+                              connection_string=connection_string)
+
+            claim.ensure_held()
+
+    assert claim.lost.is_set()
+
+
+def test_claim_held_by_another_worker_is_not_won(connection_string):
+    assert claim_work("raw:sales.xlsx:1:1", "raw", owner="worker-a", connection_string=connection_string)
+    with claimed("raw:sales.xlsx:1:1", "raw", owner="worker-b", connection_string=connection_string) as claim:
+        assert not claim
+
+
+def test_claims_cutoff_is_recorded_once(connection_string):
+    cutoff = claims_enabled_since(connection_string)
+
+    assert claims_enabled_since(connection_string) == cutoff
+    assert list_claimed_keys("raw", connection_string) == set()